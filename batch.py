@@ -0,0 +1,253 @@
+"""
+Evaluation en lot de politiques de jeu sur les niveaux.
+
+Ce module execute des parties sans affichage pour regler la difficulte:
+- N niveaux x M politiques (replays enregistres, sauts aleatoires, bots scriptes),
+- parties reparties sur un pool de processus (`concurrent.futures`),
+- resultats agreges: taux de reussite, morts par indice d'obstacle,
+  images survecues et debit en images/seconde.
+
+Politiques (`--policy`, repetable):
+- `random[:P]`: saute avec la probabilite P a chaque image (defaut 0.05),
+- `every:N`: saute toutes les N images,
+- `ahead[:D]`: saute quand un obstacle arrive a moins de D pixels (defaut 60),
+- `--replay f.gdr`: rejoue les sauts d'un replay sur son niveau.
+
+`--checkpoint f.gdr:IMAGE` fait partir toutes les parties du niveau du replay
+de l'instantane pris a l'image IMAGE de ce replay (par exemple une solution de
+`solver.py`): la fin d'un long niveau s'evalue sans rejouer son debut.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from level import Level
+from replay import Replay
+from simulation import Simulation, STATE_LEVEL_COMPLETE
+
+# Garde-fou pour les politiques qui ne meurent jamais (mode infini, etc.).
+MAX_FRAMES = 20000
+
+
+class RandomPolicy:
+    def __init__(self, seed, probability=0.05):
+        self.rng = random.Random(seed)
+        self.probability = probability
+
+    def __call__(self, simulation):
+        return self.rng.random() < self.probability
+
+
+class EveryPolicy:
+    def __init__(self, interval):
+        self.interval = interval
+
+    def __call__(self, simulation):
+        return simulation.frame % self.interval == 0
+
+
+class AheadPolicy:
+    """Bot scripte: saute des qu'un obstacle entre dans la zone devant le joueur."""
+
+    def __init__(self, distance=60):
+        self.distance = distance
+
+    def __call__(self, simulation):
+        player = simulation.player
+        left = player.x + player.size
+        return bool(simulation.level.obstacles_in_range(left, left + self.distance))
+
+
+class ReplayPolicy:
+    def __init__(self, replay):
+        self.jump_frames = set(replay.jump_frames)
+
+    def __call__(self, simulation):
+        return simulation.frame in self.jump_frames
+
+
+def make_policy(spec, seed):
+    """Construit la politique decrite par `spec` (ex: "random:0.1")."""
+    name, _, arg = spec.partition(":")
+    if name == "random":
+        return RandomPolicy(seed, float(arg) if arg else 0.05)
+    if name == "every":
+        return EveryPolicy(int(arg))
+    if name == "ahead":
+        return AheadPolicy(int(arg) if arg else 60)
+    if name == "replay":
+        return ReplayPolicy(Replay.load(arg))
+    raise ValueError(f"politique inconnue: {spec}")
+
+
+# Une simulation par niveau et par processus, remise a zero entre les parties.
+_simulations = {}
+
+
+def _simulation(level_index, seed):
+    simulation = _simulations.get(level_index)
+    if simulation is None:
+        simulation = _simulations[level_index] = Simulation(level_index, effects=False, seed=seed)
+    else:
+        simulation.reset(seed)
+    return simulation
+
+
+def run_episode(task):
+    """
+    Joue une partie. `task` = (indice du niveau, politique, graine, images max,
+    instantane de depart ou None).
+    Retourne (niveau, politique, etat final, images, obstacle fatal).
+    """
+    level_index, spec, seed, max_frames, start = task
+    simulation = _simulation(level_index, seed)
+    if start is not None:
+        simulation.restore(start)
+    policy = make_policy(spec, seed)
+    while simulation.running and simulation.frame < max_frames:
+        simulation.step(policy(simulation))
+    return level_index, spec, simulation.state, simulation.frame, simulation.death_obstacle
+
+
+def load_checkpoint(spec):
+    """
+    Instantane d'un niveau a une image donnee, `spec` = "f.gdr:IMAGE": le
+    replay est rejoue jusqu'a cette image. Retourne (niveau, instantane).
+    """
+    path, _, frame = spec.rpartition(":")
+    replay = Replay.load(path)
+    level_index = replay.resolve_level()
+    simulation = Simulation(level_index, effects=False, seed=replay.seed)
+    jump_frames = set(replay.jump_frames)
+    while simulation.running and simulation.frame < int(frame):
+        simulation.step(simulation.frame in jump_frames)
+    if not simulation.running:
+        raise ValueError(f"{path}: partie terminee avant l'image {frame}")
+    return level_index, simulation.snapshot()
+
+
+def build_tasks(level_indices, policies, runs, replays, seed, max_frames, checkpoints=None):
+    """`checkpoints`: {niveau: instantane de depart des parties de ce niveau}."""
+    checkpoints = checkpoints or {}
+    tasks = []
+    for level_index in level_indices:
+        start = checkpoints.get(level_index)
+        for spec in policies:
+            for run in range(runs):
+                tasks.append((level_index, spec, seed + run, max_frames, start))
+    # Un replay ne se joue que sur son niveau, une seule fois (deterministe).
+    for path in replays:
+        replay = Replay.load(path)
+        tasks.append((replay.resolve_level(), f"replay:{path}", replay.seed, max_frames, None))
+    return tasks
+
+
+def aggregate(results):
+    """Regroupe les resultats par (niveau, politique)."""
+    groups = {}
+    for level_index, spec, state, frames, death_obstacle in results:
+        group = groups.setdefault((level_index, spec), {
+            "level": level_index,
+            "policy": spec,
+            "runs": 0,
+            "completed": 0,
+            "frames": [],
+            "deaths": Counter(),
+        })
+        group["runs"] += 1
+        group["frames"].append(frames)
+        if state == STATE_LEVEL_COMPLETE:
+            group["completed"] += 1
+        elif death_obstacle is not None:
+            group["deaths"][death_obstacle] += 1
+
+    summary = []
+    for group in groups.values():
+        frames = sorted(group.pop("frames"))
+        deaths = group.pop("deaths")
+        group.update(
+            completion_rate=group["completed"] / group["runs"],
+            frames_mean=sum(frames) / len(frames),
+            frames_median=frames[len(frames) // 2],
+            frames_max=frames[-1],
+            total_frames=sum(frames),
+            # Obstacles les plus meurtriers en premier.
+            deaths={index: count for index, count in deaths.most_common()},
+        )
+        summary.append(group)
+    summary.sort(key=lambda group: (group["level"], group["policy"]))
+    return summary
+
+
+def run_batch(tasks, jobs=None):
+    if jobs == 1:
+        return [run_episode(task) for task in tasks]
+    jobs = jobs or os.cpu_count()
+    # Gros paquets: le cout de communication reste negligeable devant la simulation.
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(run_episode, tasks, chunksize=chunksize))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evalue des politiques de jeu en lot, sans affichage")
+    parser.add_argument("--levels", nargs="*", type=int, help="indices des niveaux (defaut: tous)")
+    parser.add_argument("--policy", action="append", dest="policies", help="politique (repetable)")
+    parser.add_argument("--replay", action="append", default=[], dest="replays", help="replay .gdr (repetable)")
+    parser.add_argument(
+        "--checkpoint", action="append", default=[], dest="checkpoints",
+        help="f.gdr:IMAGE, depart des parties du niveau du replay (repetable)",
+    )
+    parser.add_argument("--runs", type=int, default=100, help="parties par niveau et par politique")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la premiere partie")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--jobs", type=int, default=None, help="processus (defaut: nombre de coeurs)")
+    parser.add_argument("--json", help="ecrit le resume dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    checkpoints = dict(load_checkpoint(spec) for spec in args.checkpoints)
+    if args.levels is not None:
+        level_indices = args.levels
+    else:
+        level_indices = sorted(checkpoints) or list(range(Level.count()))
+    policies = args.policies if args.policies is not None else ([] if args.replays else ["random"])
+    tasks = build_tasks(
+        level_indices, policies, args.runs, args.replays, args.seed, args.max_frames, checkpoints,
+    )
+
+    start = time.perf_counter()
+    summary = aggregate(run_batch(tasks, args.jobs))
+    elapsed = time.perf_counter() - start
+    # Les images d'avant un point de depart ne sont pas simulees (le premier
+    # champ d'un instantane est son image).
+    total_frames = sum(group["total_frames"] for group in summary) - sum(
+        task[4][0] for task in tasks if task[4] is not None
+    )
+
+    for group in summary:
+        worst = ", ".join(f"#{index}: {count}" for index, count in list(group["deaths"].items())[:5])
+        print(
+            f"[{group['level'] + 1}] {group['policy']}: "
+            f"{group['completion_rate']:.1%} reussite ({group['completed']}/{group['runs']}), "
+            f"images moy {group['frames_mean']:.0f} / med {group['frames_median']} / max {group['frames_max']}"
+        )
+        if worst:
+            print(f"    morts par obstacle: {worst}")
+    print(
+        f"{len(tasks)} parties, {total_frames} images en {elapsed:.2f}s "
+        f"({total_frames / elapsed * 60 / 1e6:.2f} M images/min)"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"elapsed": elapsed, "total_frames": total_frames, "groups": summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+Benchmarks des chemins critiques (par image).
+
+Ce module mesure, sans fenetre (pilote video SDL `dummy`):
+- `Player.update` / `Player.is_on_ground` avec de longues listes d'obstacles,
+- `Level.update` sur des niveaux de plusieurs milliers d'entites,
+- la mise a jour et le dessin des particules sous forte poussiere (et, pour
+  reference, la mise a jour d'autant de particules en objets Python),
+- le dessin des obstacles, portails et du joueur sur une surface hors ecran,
+- `load_levels()` et le catalogue sur un pack synthetique de 10 000 fichiers,
+- une image complete (simulation + rendu hors ecran).
+
+Chaque mesure est le meilleur de plusieurs essais, en microsecondes par
+operation. Le resultat JSON (`--out`) se compare a un resultat precedent avec
+`--compare`: `python bench.py --out avant.json`, puis apres un changement
+`python bench.py --compare avant.json`.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from settings import *
+from level import Level, build_catalog, load_levels
+from level_compiler import ENTITY_TYPES
+from obstacles import Obstacle
+from player import Player
+from portals import GravityPortal
+from simulation import Simulation
+from texts import draw_number, draw_text
+from utils import draw_background, get_gravity_color
+
+# Un ecart relatif superieur est signale par --compare.
+REGRESSION_THRESHOLD = 0.10
+SYNTHETIC_PACK_SIZE = 10000
+
+
+def measure(func, number, repeat):
+    """Meilleur temps sur `repeat` essais de `number` appels, en us par appel."""
+    func()  # echauffement (caches de sprites, de textes...)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def _obstacle_row(count, types=("cube", "spike", "mini_spike", "long_spike")):
+    # Obstacles serres autour du joueur: le pire cas d'une liste sans broad-phase.
+    return [Obstacle(PLAYER_X - count // 2 + i, types[i % len(types)]) for i in range(count)]
+
+
+def _synthetic_patterns(count, seed=0):
+    rng = random.Random(seed)
+    names = [name for name in ENTITY_TYPES if not name.startswith("portal_")]
+    portals = [name for name in ENTITY_TYPES if name.startswith("portal_")]
+    patterns = []
+    for i in range(count):
+        items = [rng.choice(portals)] if i % 10 == 9 else rng.sample(names, rng.randint(1, 3))
+        patterns.append({"items": items, "spacing": rng.randint(120, 280)})
+    return patterns
+
+
+def bench_player(args):
+    obstacles = _obstacle_row(args.obstacles)
+    player = Player()
+
+    def update():
+        player.y = GROUND_Y - player.size
+        player.velocity_y = 0
+        player.update(BASE_GRAVITY, obstacles)
+
+    # En l'air juste au-dessus d'une rangee de cubes: `is_on_ground` ne peut pas
+    # conclure par le test du sol et parcourt toutes les plateformes.
+    cubes = _obstacle_row(args.obstacles, types=("cube",))
+    cube_top = cubes[0].get_hitbox(GROUND_Y).top
+
+    def is_on_ground():
+        player.y = cube_top - player.size - 20
+        return player.is_on_ground(cubes)
+
+    return {
+        "player_update": measure(update, args.number, args.repeat),
+        "player_is_on_ground": measure(is_on_ground, args.number, args.repeat),
+    }
+
+
+def bench_level(args):
+    patterns = _synthetic_patterns(args.entities // 2)
+    results = {}
+    for name, streaming in (("level_update", False), ("level_update_streaming", True)):
+        level = Level(patterns=patterns, streaming=streaming)
+        state = {"level": level}
+
+        def update():
+            if state["level"].update(GAME_SPEED):
+                state["level"] = Level(patterns=patterns, streaming=streaming)
+
+        results[name] = measure(update, args.number, args.repeat)
+    level = Level(patterns=patterns)
+    results["level_entities"] = len(level.obstacles) + len(level.portals)
+    return results
+
+
+class _ObjectParticle:
+    # Reference: une particule par objet, comme avant `ParticlePool`.
+    __slots__ = ("x", "y", "vx", "vy", "gravity", "size", "lifetime")
+
+    def __init__(self, x, y, vx, vy, gravity, size, lifetime):
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+        self.gravity, self.size, self.lifetime = gravity, size, lifetime
+
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        self.vy += self.gravity
+        self.lifetime -= 1
+        self.size *= 0.97
+
+
+def bench_particles(args):
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    level = Level(patterns=[])
+    particles = level.particles
+    particles.rng.seed(0)
+
+    def refill():
+        while len(particles) < particles.capacity:
+            particles.emit(
+                particles.rng.uniform(0, WIDTH), particles.rng.uniform(GROUND_Y - 100, GROUND_Y),
+                kind="dust", intensity=1.8,
+            )
+
+    def update():
+        refill()
+        particles.update()
+
+    def draw():
+        refill()
+        particles.draw(surface)
+
+    # Memes particules que le pool, une par objet, recreees a la meme cadence.
+    refill()
+    sources = list(zip(
+        particles.x.tolist(), particles.y.tolist(), particles.vx.tolist(), particles.vy.tolist(),
+        particles.gravity.tolist(), particles.size.tolist(), particles.lifetime.tolist(),
+    ))
+    objects = []
+
+    def update_objects():
+        while len(objects) < len(sources):
+            objects.append(_ObjectParticle(*sources[len(objects)]))
+        for particle in objects:
+            particle.update()
+        objects[:] = [particle for particle in objects if particle.lifetime > 0]
+
+    return {
+        "particles_update": measure(update, args.number, args.repeat),
+        "particles_update_objects": measure(update_objects, args.number, args.repeat),
+        "particles_draw": measure(draw, max(1, args.number // 10), args.repeat),
+        "particles_count": particles.capacity,
+    }
+
+
+def bench_draw(args):
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    obstacles = [Obstacle(i * 60, name) for i, name in enumerate(OBSTACLE_TYPES)]
+    portals = [GravityPortal(200 + i * 120, key) for i, key in enumerate(PORTAL_TYPES)]
+    player = Player()
+    state = {"frame": 0}
+
+    def draw_obstacles():
+        for obstacle in obstacles:
+            obstacle.draw(surface, GROUND_Y)
+
+    def draw_portals():
+        for portal in portals:
+            portal.draw(surface, GROUND_Y)
+
+    def draw_player():
+        state["frame"] += 1
+        player.rotation = -6 * state["frame"]
+        player.draw(surface, CYAN)
+
+    return {
+        "obstacle_draw": measure(draw_obstacles, args.number, args.repeat) / len(obstacles),
+        "portal_draw": measure(draw_portals, args.number, args.repeat) / len(portals),
+        "player_draw": measure(draw_player, args.number, args.repeat),
+    }
+
+
+def bench_load_levels(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        pack = Path(tmp)
+        patterns = _synthetic_patterns(20)
+        for i in range(args.pack_size):
+            data = {"name": f"Niveau {i}", "patterns": patterns[i % 5:i % 5 + 15]}
+            (pack / f"level_{i:05d}.json").write_text(json.dumps(data), encoding="utf-8")
+
+        def timed(func):
+            start = time.perf_counter()
+            func()
+            return (time.perf_counter() - start) * 1e6
+
+        return {
+            "load_levels_pack": timed(lambda: load_levels(pack)),
+            "catalog_pack_cold": timed(lambda: build_catalog(pack)),
+            "catalog_pack_warm": timed(lambda: build_catalog(pack)),
+            "pack_size": args.pack_size,
+        }
+
+
+def bench_frame(args):
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    rng = random.Random(0)
+    state = {"simulation": Simulation(0, seed=0)}
+
+    def frame():
+        simulation = state["simulation"]
+        if not simulation.running:
+            simulation = state["simulation"] = Simulation(0, seed=0)
+        simulation.step(rng.random() < 0.05)
+        draw_background(surface, simulation.level.scroll)
+        simulation.level.draw(surface, GROUND_Y)
+        simulation.player.draw(surface, get_gravity_color(simulation.current_gravity_effect))
+        score_rect = draw_text(surface, "Score: ", (10, 10), CYAN)
+        draw_number(surface, simulation.score, (score_rect.right, 10), CYAN)
+        draw_text(surface, f"Gravite: {simulation.current_gravity_effect}", (10, 100), CYAN)
+
+    def headless():
+        simulation = state["simulation"]
+        if not simulation.running:
+            simulation = state["simulation"] = Simulation(0, effects=False, seed=0)
+        simulation.step(rng.random() < 0.05)
+
+    frame_us = measure(frame, args.number, args.repeat)
+    state["simulation"] = Simulation(0, effects=False, seed=0)
+    headless_us = measure(headless, args.number, args.repeat)
+    return {
+        "frame": frame_us,
+        "frame_fps": 1e6 / frame_us,
+        "simulation_step": headless_us,
+        "simulation_fps": 1e6 / headless_us,
+    }
+
+
+BENCHMARKS = {
+    "player": bench_player,
+    "level": bench_level,
+    "particles": bench_particles,
+    "draw": bench_draw,
+    "load_levels": bench_load_levels,
+    "frame": bench_frame,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Affiche l'ecart par mesure; retourne le nombre de regressions."""
+    regressions = 0
+    for group, values in results.items():
+        for name, value in values.items():
+            old = baseline.get(group, {}).get(name)
+            if not old or name.endswith(("_count", "_entities", "_size")):
+                continue
+            # Pour les *_fps, plus grand est meilleur.
+            ratio = old / value if name.endswith("_fps") else value / old
+            flag = ""
+            if ratio > 1 + REGRESSION_THRESHOLD:
+                flag = "  << REGRESSION"
+                regressions += 1
+            print(f"  {group}.{name}: {old:.2f} -> {value:.2f} ({ratio - 1:+.1%}){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques par image")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="benchmarks a lancer")
+    parser.add_argument("--number", type=int, default=500, help="appels par essai")
+    parser.add_argument("--repeat", type=int, default=5, help="essais (le meilleur est retenu)")
+    parser.add_argument("--obstacles", type=int, default=1000, help="obstacles pour les tests du joueur")
+    parser.add_argument("--entities", type=int, default=5000, help="entites pour Level.update")
+    parser.add_argument("--pack-size", type=int, default=SYNTHETIC_PACK_SIZE, help="fichiers du pack synthetique")
+    parser.add_argument("--out", help="ecrit les resultats dans ce fichier JSON")
+    parser.add_argument("--compare", help="resultats JSON de reference")
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    pygame.font.init()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        results[name] = BENCHMARKS[name](args)
+        for key, value in results[name].items():
+            unit = "" if key.endswith(("_fps", "_count", "_entities", "_size")) else " us"
+            print(f"{name}.{key}: {value:.2f}{unit}")
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Comparaison avec {args.compare} ({baseline.get('commit')}):")
+        if compare(results, baseline["results"]):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,45 @@
 """
 Gestion des niveaux du jeu.
 
-Ce module charge les niveaux depuis `levels/*.json`.
+Ce module charge les niveaux depuis `levels/*.json` et `levels/*.txt`.
 Chaque fichier contient un nom et des patterns de jeu editables sans toucher au code.
+
+Le menu ne lit qu'un catalogue (nom, taille, nombre de patterns) construit de
+facon incrementale; les patterns d'un niveau ne sont charges qu'a la creation
+du `Level` correspondant, avec un cache LRU des niveaux recents.
+
+En mode streaming, les entites sont creees juste avant d'entrer a l'ecran et
+liberees apres en etre sorties: la memoire ne depend plus de la longueur du
+niveau, ce qui permet aussi un mode infini genere proceduralement.
+
+Les collisions se testent par lots (`obstacle_collisions`, ou
+`obstacle_collisions_many` pour des milliers de joueurs simules a la fois)
+sur les hitboxes monde precalculees a la compilation.
 """
 import json
+import random
+from collections import deque
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
 from pathlib import Path
-from obstacles import Obstacle
-from portals import GravityPortal
-from particles import Particle
-from settings import OBSTACLE_TYPES, PORTAL_TYPES
+
+import numpy as np
+import pygame
+
+from particles import ParticlePool
+from level_compiler import (
+    CACHE_DIR_NAME,
+    ENTITY_TYPE_IDS,
+    LEVEL_START_X,
+    PORTAL_TYPE_IDS,
+    compile_patterns,
+    entity_from_record,
+    iter_records,
+    load_compiled,
+    pattern_records,
+)
+from settings import OBSTACLE_TYPES, PORTAL_TYPES, WIDTH
 
 DEFAULT_LEVEL_LIBRARY = [
     {
@@ -130,6 +160,7 @@ def _load_level_file(path_obj):
     return {
         "name": str(data.get("name") or path_obj.stem),
         "patterns": patterns,
+        "path": path_obj,
     }
 
 
@@ -161,22 +192,36 @@ def _load_text_level_file(path_obj):
     patterns = _normalize_patterns(raw_patterns)
     if not patterns:
         return None
-    return {"name": name, "patterns": patterns}
+    return {"name": name, "patterns": patterns, "path": path_obj}
+
+
+LEVELS_DIR = Path(__file__).resolve().parent / "levels"
+CATALOG_FILE_NAME = "catalog.json"
+CATALOG_VERSION = 1
+# Nombre de niveaux recemment charges gardes en memoire.
+LEVEL_CACHE_SIZE = 16
+
+
+def _level_files(levels_dir):
+    level_files = list(levels_dir.glob("*.json")) + list(levels_dir.glob("*.txt"))
+    return sorted(level_files)
+
+
+def _load_level_path(level_path):
+    if level_path.suffix.lower() == ".txt":
+        return _load_text_level_file(level_path)
+    return _load_level_file(level_path)
 
 
-def load_levels():
-    base_dir = Path(__file__).resolve().parent
-    levels_dir = base_dir / "levels"
+def load_levels(levels_dir=LEVELS_DIR):
+    """Analyse completement tous les fichiers de niveau (noms et patterns)."""
+    levels_dir = Path(levels_dir)
     loaded = []
 
     if levels_dir.exists():
-        level_files = list(levels_dir.glob("*.json")) + list(levels_dir.glob("*.txt"))
-        for level_path in sorted(level_files):
+        for level_path in _level_files(levels_dir):
             try:
-                if level_path.suffix.lower() == ".txt":
-                    level_data = _load_text_level_file(level_path)
-                else:
-                    level_data = _load_level_file(level_path)
+                level_data = _load_level_path(level_path)
                 if level_data:
                     loaded.append(level_data)
             except (OSError, json.JSONDecodeError):
@@ -187,79 +232,573 @@ def load_levels():
     return DEFAULT_LEVEL_LIBRARY
 
 
-LEVEL_LIBRARY = load_levels()
+def build_catalog(levels_dir=LEVELS_DIR):
+    """
+    Index des niveaux: nom, chemin, taille, nombre de patterns et mtime.
+
+    L'index est enregistre dans `levels/.cache/catalog.json`; seuls les
+    fichiers nouveaux ou modifies depuis la derniere construction sont
+    analyses.
+    """
+    levels_dir = Path(levels_dir)
+    catalog_path = levels_dir / CACHE_DIR_NAME / CATALOG_FILE_NAME
+    previous = {}
+    try:
+        stored = json.loads(catalog_path.read_text(encoding="utf-8"))
+        if stored.get("version") == CATALOG_VERSION:
+            previous = {entry["file"]: entry for entry in stored["levels"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    entries = []
+    changed = False
+    if levels_dir.exists():
+        for level_path in _level_files(levels_dir):
+            try:
+                stat = level_path.stat()
+            except OSError:
+                continue
+            entry = previous.get(level_path.name)
+            if (entry is not None and entry["mtime_ns"] == stat.st_mtime_ns
+                    and entry["size"] == stat.st_size):
+                entries.append(entry)
+                continue
+
+            changed = True
+            try:
+                level_data = _load_level_path(level_path)
+            except (OSError, json.JSONDecodeError):
+                level_data = None
+            # Les fichiers invalides restent indexes (0 pattern) pour ne pas
+            # etre re-analyses a chaque demarrage.
+            entries.append({
+                "file": level_path.name,
+                "name": level_data["name"] if level_data else level_path.stem,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "patterns": len(level_data["patterns"]) if level_data else 0,
+            })
+
+    if changed or len(entries) != len(previous):
+        try:
+            catalog_path.parent.mkdir(exist_ok=True)
+            catalog_path.write_text(
+                json.dumps({"version": CATALOG_VERSION, "levels": entries}, indent=1),
+                encoding="utf-8",
+            )
+        except OSError:
+            pass
+
+    catalog = [
+        dict(entry, path=levels_dir / entry["file"])
+        for entry in entries
+        if entry["patterns"] > 0
+    ]
+    if catalog:
+        return catalog
+    return [
+        {"name": level["name"], "path": None, "patterns": len(level["patterns"]), "data": level}
+        for level in DEFAULT_LEVEL_LIBRARY
+    ]
+
+
+_catalog = None
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = build_catalog()
+    return _catalog
+
+
+@lru_cache(maxsize=LEVEL_CACHE_SIZE)
+def _load_patterns(path, mtime_ns):
+    level_data = _load_level_path(path)
+    return level_data["patterns"] if level_data else []
+
+
+@lru_cache(maxsize=LEVEL_CACHE_SIZE)
+def _load_compiled_level(path, mtime_ns):
+    # Les patterns ne sont analyses que si la table en cache est perimee.
+    try:
+        return load_compiled(path, lambda: _load_patterns(path, mtime_ns))
+    except OSError:
+        return compile_patterns([])
+
+
+def get_compiled_level(level_index):
+    entry = get_catalog()[level_index]
+    if entry["path"] is None:
+        compiled = entry.get("compiled")
+        if compiled is None:
+            compiled = entry["compiled"] = compile_patterns(entry["data"]["patterns"])
+        return compiled
+    return _load_compiled_level(entry["path"], entry["mtime_ns"])
+
+
+# Une entite est retiree du jeu quand son bord gauche passe sous cette abscisse
+# d'ecran.
+CULL_X = -100
+# Mode streaming: distance au-dela du bord droit ou les entites sont creees, et
+# nombre d'entites sorties a gauche avant de les liberer.
+SPAWN_MARGIN = 200
+RELEASE_BATCH = 32
+
+# Patterns tires par le mode infini: (items, espacement minimal, maximal).
+ENDLESS_PATTERNS = [
+    (["spike"], 170, 280),
+    (["cube"], 150, 260),
+    (["mini_spike"], 140, 220),
+    (["long_spike"], 170, 260),
+    (["spike", "mini_spike"], 150, 220),
+    (["cube", "spike"], 130, 220),
+    (["mini_spike", "spike"], 130, 200),
+    (["spike", "cube"], 150, 220),
+]
+ENDLESS_PORTALS = ["portal_low", "portal_high", "portal_normal"]
+
+
+def endless_patterns(seed=None):
+    """
+    Generateur infini de patterns aleatoires (reproductible avec `seed`).
+    L'espacement se resserre progressivement jusqu'au minimum de chaque pattern.
+    """
+    rng = random.Random(seed)
+    count = 0
+    while True:
+        count += 1
+        yield _endless_pattern(rng, count)
+
+
+def _endless_pattern(rng, count):
+    # Pattern numero `count` (a partir de 1) du mode infini.
+    if count % 12 == 0:
+        return {"items": [rng.choice(ENDLESS_PORTALS)], "spacing": 170}
+    items, min_spacing, max_spacing = rng.choice(ENDLESS_PATTERNS)
+    # Difficulte croissante: l'espacement maximal baisse avec la distance.
+    ceiling = max(min_spacing, max_spacing - count // 10 * 10)
+    return {"items": list(items), "spacing": rng.randint(min_spacing, ceiling)}
+
+
+class EndlessPatterns:
+    """Patterns du mode infini; chaque iteration repart de la graine."""
+
+    def __init__(self, seed=None):
+        self.seed = seed
+
+    def __iter__(self):
+        return endless_patterns(self.seed)
+
+    def records(self, state=None):
+        """Lignes de table du mode infini, reprises a `state` si fourni."""
+        return EndlessRecords(self.seed, state)
+
+
+class EndlessRecords:
+    """
+    Lignes de table du mode infini (memes que `iter_records(EndlessPatterns)`)
+    dont la position se capture (`state()`) et se reprend sans regenerer le
+    debut du niveau.
+    """
+
+    def __init__(self, seed=None, state=None):
+        self._rng = random.Random(seed)
+        self.count = 0
+        self.x_position = LEVEL_START_X
+        self._pending = deque()
+        if state is not None:
+            (version, internal, gauss_next), self.count, self.x_position, pending = state
+            # Apres un passage par JSON, les tuples sont devenus des listes.
+            self._rng.setstate((version, tuple(internal), gauss_next))
+            self._pending.extend(tuple(record) for record in pending)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._pending:
+            self.count += 1
+            records, self.x_position = pattern_records(
+                _endless_pattern(self._rng, self.count), self.x_position,
+            )
+            self._pending.extend(records)
+        return self._pending.popleft()
+
+    def state(self, pending=()):
+        """Position courante; `pending` sont des lignes a rendre avant la suite."""
+        return (self._rng.getstate(), self.count, self.x_position,
+                (*pending, *self._pending))
 
 
 class Level:
-    def __init__(self, level_index=0):
-        self.level_index = max(0, min(level_index, len(LEVEL_LIBRARY) - 1))
+    def __init__(self, level_index=0, streaming=False, patterns=None):
+        """
+        `streaming` materialise les entites juste avant le bord droit de
+        l'ecran et les libere a gauche. `patterns` remplace le niveau du
+        catalogue; un iterable infini exige le streaming, et `reset()` le
+        parcourt a nouveau (il doit etre re-iterable, pas un generateur).
+        """
+        if patterns is None:
+            self.level_index = max(0, min(level_index, Level.count() - 1))
+            self.compiled = get_compiled_level(self.level_index)
+        else:
+            self.level_index = None
+            self.compiled = None
+        self.patterns = patterns
+        self._records = self._iter_records()
+        self.streaming = streaming
+        # Positions fixes dans le monde, triees par x. Seul `scroll` (la camera)
+        # avance a chaque image; l'ecran correspond a x_monde - scroll.
         self.obstacles = []
         self.portals = []
-        self.particles = []
+        self.particles = ParticlePool()
+        self.scroll = 0
+        # Indices des premieres entites encore en jeu (les precedentes sont
+        # sorties a gauche de l'ecran).
+        self.first_obstacle = 0
+        self.first_portal = 0
+        # Nombre d'obstacles liberes en mode streaming: l'indice global d'un
+        # obstacle est released_obstacles + son indice dans `obstacles`.
+        self.released_obstacles = 0
+        self._obstacle_xs = []
+        self._portal_xs = []
+        # Hitboxes en coordonnees monde, paralleles a `obstacles`/`portals`:
+        # une collision teste toute une tranche en un appel (`collidelistall`).
+        self._obstacle_hitboxes = []
+        self._portal_hitboxes = []
+        self._max_obstacle_width = 0
+        self._max_portal_width = 0
+        self._next_record = next(self._records, None)
         self.generate_level()
 
+    @classmethod
+    def endless(cls, seed=None):
+        """Niveau infini genere par `endless_patterns`."""
+        return cls(streaming=True, patterns=EndlessPatterns(seed))
+
     @staticmethod
     def count():
-        return len(LEVEL_LIBRARY)
+        return len(get_catalog())
 
     @staticmethod
     def get_name(level_index):
-        safe_index = max(0, min(level_index, len(LEVEL_LIBRARY) - 1))
-        return LEVEL_LIBRARY[safe_index]["name"]
-
-    def generate_level(self):
-        x_position = 1200
-        patterns = LEVEL_LIBRARY[self.level_index]["patterns"]
-
-        for entry in patterns:
-            obstacle_types = entry["items"]
-            spacing = entry["spacing"]
-            for i, obstacle_type in enumerate(obstacle_types):
-                if obstacle_type.startswith("portal_"):
-                    portal_key = obstacle_type.replace("portal_", "")
-                    if portal_key in PORTAL_TYPES:
-                        self.portals.append(GravityPortal(x_position, portal_key))
-                        x_position += 50
-                else:
-                    if obstacle_type in OBSTACLE_TYPES:
-                        self.obstacles.append(Obstacle(x_position, obstacle_type))
-                        if i < len(obstacle_types) - 1:
-                            x_position += 70
-            x_position += spacing
-
-    def update(self, game_speed):
-        for obstacle in self.obstacles:
-            obstacle.update(game_speed)
-        self.obstacles = [obs for obs in self.obstacles if obs.x > -100]
-
+        safe_index = max(0, min(level_index, Level.count() - 1))
+        return get_catalog()[safe_index]["name"]
+
+    def _iter_records(self):
+        if self.compiled is not None:
+            return iter(self.compiled.records)
+        if isinstance(self.patterns, EndlessPatterns):
+            return self.patterns.records()
+        return iter_records(self.patterns)
+
+    def reset(self):
+        """
+        Remet le niveau a son etat initial sans recreer ses entites: camera
+        au debut, portails desactives, particules videes. Seul un niveau en
+        streaming, dont les entites deja passees ont ete liberees, est
+        regenere depuis sa source.
+        """
+        self.particles.clear()
+        if self.streaming:
+            self._rebuild_window(0)
+            return
+        self.seek(0)
         for portal in self.portals:
-            portal.update(game_speed)
-        self.portals = [p for p in self.portals if p.x > -100]
+            portal.activated = False
+            portal.animation_offset = 0
+
+    def _rebuild_window(self, scroll):
+        # Streaming: recree les seules entites encore en jeu a `scroll`. Les
+        # enregistrements deja sortis a gauche sont sautes sans creer
+        # d'entite: par dichotomie pour un niveau compile; en mode infini,
+        # les patterns sont regeneres (`restore` reprend plutot le generateur
+        # capture par `snapshot`).
+        self._clear_window(scroll)
+        cull_x = scroll + CULL_X
+        if self.compiled is not None:
+            records = self.compiled.records
+            start = bisect_right(self.compiled.xs, cull_x)
+            self.released_obstacles = bisect_right(self.compiled.obstacle_xs, cull_x)
+            self._records = (records[i] for i in range(start, len(records)))
+            record = next(self._records, None)
+        else:
+            self._records = self._iter_records()
+            record = next(self._records, None)
+            while record is not None and record[1] <= cull_x:
+                if record[0] not in PORTAL_TYPE_IDS:
+                    self.released_obstacles += 1
+                record = next(self._records, None)
+        self._next_record = record
+        self.generate_level()
 
-        self.particles = [p for p in self.particles if p.lifetime > 0]
-        for particle in self.particles:
-            particle.update()
+    def _clear_window(self, scroll):
+        for entities in (self.obstacles, self.portals, self._obstacle_xs, self._portal_xs,
+                         self._obstacle_hitboxes, self._portal_hitboxes):
+            entities.clear()
+        self.scroll = scroll
+        self.first_obstacle = 0
+        self.first_portal = 0
+        self.released_obstacles = 0
 
-        return not self.obstacles and not self.portals
+    def generate_level(self):
+        if self.streaming:
+            self._spawn_until(self.scroll + WIDTH + SPAWN_MARGIN)
+        else:
+            self._spawn_until(float("inf"))
+
+    def _spawn_until(self, world_x):
+        record = self._next_record
+        while record is not None and record[1] <= world_x:
+            entity = entity_from_record(record)
+            if record[0] in PORTAL_TYPE_IDS:
+                self.portals.append(entity)
+                self._portal_xs.append(entity.x)
+                self._portal_hitboxes.append(pygame.Rect(record[2:]))
+                self._max_portal_width = max(self._max_portal_width, entity.kind.width)
+            else:
+                self.obstacles.append(entity)
+                self._obstacle_xs.append(entity.x)
+                self._obstacle_hitboxes.append(pygame.Rect(record[2:]))
+                self._max_obstacle_width = max(self._max_obstacle_width, entity.kind.width)
+            record = next(self._records, None)
+        self._next_record = record
+
+    def _release_culled(self):
+        # Libere les entites sorties a gauche (par paquets, cout amorti O(1)).
+        if self.first_obstacle >= RELEASE_BATCH:
+            del self.obstacles[:self.first_obstacle]
+            del self._obstacle_xs[:self.first_obstacle]
+            del self._obstacle_hitboxes[:self.first_obstacle]
+            self.released_obstacles += self.first_obstacle
+            self.first_obstacle = 0
+        if self.first_portal >= RELEASE_BATCH:
+            del self.portals[:self.first_portal]
+            del self._portal_xs[:self.first_portal]
+            del self._portal_hitboxes[:self.first_portal]
+            self.first_portal = 0
+
+    def obstacles_in_range(self, left, right):
+        """Obstacles dont l'emprise horizontale (ecran) chevauche [left, right]."""
+        return self._query(
+            self.obstacles, self._obstacle_xs, self.first_obstacle,
+            self._max_obstacle_width, left, right,
+        )
+
+    def portals_in_range(self, left, right):
+        """Portails dont l'emprise horizontale (ecran) chevauche [left, right]."""
+        return self._query(
+            self.portals, self._portal_xs, self.first_portal,
+            self._max_portal_width, left, right,
+        )
+
+    def visible_obstacles(self):
+        return self.obstacles_in_range(CULL_X, WIDTH)
+
+    def visible_portals(self):
+        return self.portals_in_range(CULL_X, WIDTH)
+
+    def _query(self, entities, xs, first, max_width, left, right):
+        # Recherche dichotomique sur les x du monde: le cout ne depend que du
+        # nombre d'entites retournees, pas de la longueur du niveau.
+        world_left = left + self.scroll
+        world_right = right + self.scroll
+        start = max(first, bisect_left(xs, world_left - max_width))
+        end = bisect_right(xs, world_right)
+        return [
+            entity for entity in entities[start:end]
+            if entity.x + entity.kind.width >= world_left
+        ]
+
+    def obstacle_collisions(self, rect):
+        """
+        Indices (dans `obstacles`) des obstacles dont la hitbox chevauche
+        `rect` (coordonnees ecran), en un seul appel `collidelistall`.
+        """
+        return self._collisions(
+            self._obstacle_hitboxes, self._obstacle_xs, self.first_obstacle,
+            self._max_obstacle_width, rect,
+        )
+
+    def portal_collisions(self, rect):
+        """Indices (dans `portals`) des portails dont la hitbox chevauche `rect`."""
+        return self._collisions(
+            self._portal_hitboxes, self._portal_xs, self.first_portal,
+            self._max_portal_width, rect,
+        )
+
+    def obstacle_collisions_many(self, left, top, right, bottom):
+        """
+        Collisions de nombreux rectangles a la fois (un par joueur simule),
+        donnes en tableaux NumPy de bords (coordonnees ecran). Retourne les
+        indices (dans `obstacles`) des candidats et une matrice booleenne:
+        `overlap[c, r]` si l'obstacle `indices[c]` chevauche le rectangle r.
+        La tranche candidate n'est calculee qu'une fois pour tous.
+        """
+        return self._collisions_many(
+            self._obstacle_hitboxes, self._obstacle_xs, self.first_obstacle,
+            self._max_obstacle_width, left, top, right, bottom,
+        )
+
+    def portal_collisions_many(self, left, top, right, bottom):
+        """Comme `obstacle_collisions_many`, pour les portails."""
+        return self._collisions_many(
+            self._portal_hitboxes, self._portal_xs, self.first_portal,
+            self._max_portal_width, left, top, right, bottom,
+        )
+
+    def obstacle_hitbox(self, index):
+        """Hitbox (coordonnees monde) de l'obstacle `obstacles[index]`."""
+        return self._obstacle_hitboxes[index]
+
+    def portal_hitbox(self, index):
+        """Hitbox (coordonnees monde) du portail `portals[index]`."""
+        return self._portal_hitboxes[index]
+
+    def _candidates(self, hitboxes, xs, first, max_width, left, right):
+        world_left = left + self.scroll
+        start = max(first, bisect_left(xs, world_left - max_width))
+        end = bisect_right(xs, right + self.scroll)
+        return start, hitboxes[start:end]
+
+    def _collisions_many(self, hitboxes, xs, first, max_width, left, top, right, bottom):
+        if len(left) == 0:
+            return range(0), np.zeros((0, 0), dtype=bool)
+        start, candidates = self._candidates(
+            hitboxes, xs, first, max_width, float(left.min()), float(right.max()),
+        )
+        if not candidates:
+            return range(0), np.zeros((0, len(left)), dtype=bool)
+        # Bords des candidats (monde vers ecran), puis chevauchement strict
+        # comme `colliderect`. Une ligne par candidat: chaque comparaison
+        # parcourt une ligne contigue de rectangles.
+        boxes = np.array(candidates, dtype=float)
+        box_left = boxes[:, 0, None] - self.scroll
+        box_top = boxes[:, 1, None]
+        box_right = box_left + boxes[:, 2, None]
+        box_bottom = box_top + boxes[:, 3, None]
+        overlap = (box_left < right) & (box_right > left) & (box_top < bottom) & (box_bottom > top)
+        return range(start, start + len(candidates)), overlap
+
+    def _collisions(self, hitboxes, xs, first, max_width, rect):
+        start, candidates = self._candidates(hitboxes, xs, first, max_width, rect.left, rect.right)
+        return [start + i for i in rect.move(self.scroll, 0).collidelistall(candidates)]
+
+    def seek(self, scroll):
+        """
+        Place la camera a `scroll`. En streaming, la fenetre d'entites est
+        reconstruite depuis la source du niveau.
+        """
+        if self.streaming:
+            self._rebuild_window(scroll)
+            return
+        self.scroll = scroll
+        cull_x = scroll + CULL_X
+        self.first_obstacle = bisect_right(self._obstacle_xs, cull_x)
+        self.first_portal = bisect_right(self._portal_xs, cull_x)
+
+    def snapshot(self):
+        """
+        Etat du niveau: (scroll, x monde des portails actives, generateur).
+        Seuls les portails encore a l'ecran sont consideres: les autres sont
+        sortis a gauche ou n'ont pas encore pu etre traverses. Le dernier
+        champ n'est rempli qu'en mode infini: obstacles deja liberes et
+        position du generateur, entites en jeu comprises (`EndlessRecords`).
+        """
+        end = bisect_right(self._portal_xs, self.scroll + WIDTH)
+        activated = tuple(
+            portal.x for portal in self.portals[self.first_portal:end] if portal.activated
+        )
+        stream = None
+        if isinstance(self._records, EndlessRecords):
+            stream = (self.released_obstacles + self.first_obstacle,
+                      self._records.state(self._window_records()))
+        return self.scroll, activated, stream
+
+    def _window_records(self):
+        # Lignes de table des entites en jeu et de la prochaine a creer, par x.
+        records = [
+            (ENTITY_TYPE_IDS[obstacle.kind.name], obstacle.x, *hitbox)
+            for obstacle, hitbox in zip(self.obstacles[self.first_obstacle:],
+                                        self._obstacle_hitboxes[self.first_obstacle:])
+        ]
+        records.extend(
+            (ENTITY_TYPE_IDS["portal_" + portal.kind.name], portal.x, *hitbox)
+            for portal, hitbox in zip(self.portals[self.first_portal:],
+                                      self._portal_hitboxes[self.first_portal:])
+        )
+        # Obstacles et portails sont en listes separees: fusion par x.
+        records.sort(key=itemgetter(1))
+        if self._next_record is not None:
+            records.append(self._next_record)
+        return records
+
+    def restore(self, snapshot):
+        """
+        Revient a l'etat capture par `snapshot()`. Le cout depend des entites
+        a l'ecran et des portails traverses depuis la capture, pas de la
+        longueur du niveau. Les particules sont videes.
+        """
+        scroll, activated, stream = snapshot
+        # Portails qui ont pu etre actives depuis la capture, ou avant elle.
+        limit = max(self.scroll, scroll) + WIDTH
+        if stream is None:
+            self.seek(scroll)
+        else:
+            released, state = stream
+            self._clear_window(scroll)
+            self.released_obstacles = released
+            self._records = self.patterns.records(state)
+            self._next_record = next(self._records, None)
+            self.generate_level()
+        self.particles.clear()
+        end = bisect_right(self._portal_xs, limit)
+        for portal in self.portals[self.first_portal:end]:
+            portal.activated = portal.x in activated
 
-    def draw(self, surface, ground_y):
-        for portal in self.portals:
-            portal.draw(surface, ground_y)
-        for obstacle in self.obstacles:
-            obstacle.draw(surface, ground_y)
-        for particle in self.particles:
-            particle.draw(surface)
+    def update(self, game_speed):
+        self.scroll += game_speed
+        if self.streaming:
+            self._spawn_until(self.scroll + WIDTH + SPAWN_MARGIN)
+        cull_x = self.scroll + CULL_X
+        while (self.first_obstacle < len(self.obstacles)
+               and self.obstacles[self.first_obstacle].x <= cull_x):
+            self.first_obstacle += 1
+        while (self.first_portal < len(self.portals)
+               and self.portals[self.first_portal].x <= cull_x):
+            self.first_portal += 1
+
+        if self.streaming:
+            self._release_culled()
+
+        self.particles.update()
+
+        return (self._next_record is None
+                and self.first_obstacle >= len(self.obstacles)
+                and self.first_portal >= len(self.portals))
+
+    def draw(self, surface, ground_y, scroll=None):
+        """
+        Dessine le niveau et retourne les zones touchees. `scroll` permet de
+        dessiner a une position interpolee entre deux images de simulation.
+        """
+        if scroll is None:
+            scroll = self.scroll
+        rects = []
+        for portal in self.visible_portals():
+            rects.append(portal.draw(surface, ground_y, scroll))
+        for obstacle in self.visible_obstacles():
+            rects.append(obstacle.draw(surface, ground_y, scroll))
+        rects.extend(self.particles.draw(surface))
+        return rects
 
     def create_dust_particles(self, x, y, color=None, intensity=1.0):
         count = max(2, int(5 * max(0.5, intensity)))
         for _ in range(count):
-            self.particles.append(
-                Particle(x, y, color=color, kind="dust", intensity=intensity)
-            )
+            self.particles.emit(x, y, color=color, kind="dust", intensity=intensity)
 
     def create_portal_particles(self, x, y, color=None, intensity=1.0):
         count = max(8, int(12 * max(0.5, intensity)))
         for _ in range(count):
-            self.particles.append(
-                Particle(x, y, color=color, kind="portal", intensity=intensity)
-            )
+            self.particles.emit(x, y, color=color, kind="portal", intensity=intensity)
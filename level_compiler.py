@@ -0,0 +1,182 @@
+"""
+Compilation des niveaux.
+
+Ce module transforme les patterns d'un niveau en une table plate d'entites:
+- une ligne par obstacle/portail: (type_id, x monde, hitbox monde),
+- la table est enregistree dans `levels/.cache/` au format binaire (`struct`),
+- le cache est indexe par la date de modification et le hash du fichier source,
+  et invalide si les types d'entites changent dans `settings.py`.
+
+Un chargement ou un redemarrage relit la table au lieu de re-analyser le
+fichier et de re-developper les patterns.
+"""
+import hashlib
+import struct
+from functools import cached_property
+from pathlib import Path
+
+from obstacles import OBSTACLE_KINDS, Obstacle
+from portals import PORTAL_KINDS, GravityPortal
+from settings import GROUND_Y, OBSTACLE_TYPES, PORTAL_TYPES
+
+# Abscisse monde du premier element d'un niveau.
+LEVEL_START_X = 1200
+
+# Identifiants de type: obstacles puis portails, dans l'ordre de settings.py.
+ENTITY_TYPES = tuple(OBSTACLE_TYPES) + tuple(f"portal_{key}" for key in PORTAL_TYPES)
+ENTITY_TYPE_IDS = {name: type_id for type_id, name in enumerate(ENTITY_TYPES)}
+PORTAL_TYPE_IDS = frozenset(
+    type_id for type_id, name in enumerate(ENTITY_TYPES) if name.startswith("portal_")
+)
+
+CACHE_DIR_NAME = ".cache"
+FORMAT_VERSION = 1
+MAGIC = b"GDLV"
+# magic, version, schema, mtime_ns, taille source, sha1 source, nombre d'entites
+HEADER = struct.Struct("<4sH20sqq20sI")
+# type_id, x, hitbox (gauche, haut, largeur, hauteur) en coordonnees monde
+RECORD = struct.Struct("<Hiiiii")
+
+
+def _schema_digest():
+    # Tout ce qui change le resultat de la compilation invalide le cache.
+    schema = repr((
+        FORMAT_VERSION,
+        LEVEL_START_X,
+        GROUND_Y,
+        ENTITY_TYPES,
+        [(kind.width, kind.height, kind.hitbox) for kind in OBSTACLE_KINDS.values()],
+        [kind.hitbox for kind in PORTAL_KINDS.values()],
+    ))
+    return hashlib.sha1(schema.encode("utf-8")).digest()
+
+
+SCHEMA_DIGEST = _schema_digest()
+
+
+class CompiledLevel:
+    def __init__(self, records, packed=None):
+        # Tuples (type_id, x, left, top, width, height), tries par x.
+        self.records = records
+        if packed is None:
+            packed = pack_records(records)
+        # Identifie le contenu du niveau (replays, caches).
+        self.digest = hashlib.sha1(packed).hexdigest()
+
+    def __len__(self):
+        return len(self.records)
+
+    @cached_property
+    def xs(self):
+        """x de toutes les lignes (recherche dichotomique), calcule au premier besoin."""
+        return [record[1] for record in self.records]
+
+    @cached_property
+    def obstacle_xs(self):
+        """x des obstacles (sans les portails), calcule au premier besoin."""
+        return [record[1] for record in self.records if record[0] not in PORTAL_TYPE_IDS]
+
+
+def entity_from_record(record):
+    name = ENTITY_TYPES[record[0]]
+    if record[0] in PORTAL_TYPE_IDS:
+        return GravityPortal(record[1], name.replace("portal_", ""))
+    return Obstacle(record[1], name)
+
+
+def pattern_records(entry, x_position):
+    """Lignes de table d'un pattern place a `x_position`, et le x du suivant."""
+    records = []
+    obstacle_types = entry["items"]
+    for i, obstacle_type in enumerate(obstacle_types):
+        if obstacle_type.startswith("portal_"):
+            portal_key = obstacle_type.replace("portal_", "")
+            if portal_key in PORTAL_TYPES:
+                hitbox = GravityPortal(x_position, portal_key).get_hitbox(GROUND_Y)
+                records.append((ENTITY_TYPE_IDS[obstacle_type], x_position, *hitbox))
+                x_position += 50
+        else:
+            if obstacle_type in OBSTACLE_TYPES:
+                hitbox = Obstacle(x_position, obstacle_type).get_hitbox(GROUND_Y)
+                records.append((ENTITY_TYPE_IDS[obstacle_type], x_position, *hitbox))
+                if i < len(obstacle_types) - 1:
+                    x_position += 70
+    return records, x_position + entry["spacing"]
+
+
+def iter_records(patterns):
+    """
+    Developpe des patterns normalises en lignes de table, a la demande:
+    `patterns` peut etre un generateur infini (mode infini).
+    """
+    x_position = LEVEL_START_X
+
+    for entry in patterns:
+        records, x_position = pattern_records(entry, x_position)
+        yield from records
+
+
+def compile_patterns(patterns):
+    """Developpe des patterns normalises en table d'entites."""
+    return CompiledLevel(list(iter_records(patterns)))
+
+
+def pack_records(records):
+    return b"".join(RECORD.pack(*record) for record in records)
+
+
+def cache_path(source_path):
+    source_path = Path(source_path)
+    return source_path.parent / CACHE_DIR_NAME / f"{source_path.name}.bin"
+
+
+def load_compiled(source_path, patterns_loader):
+    """
+    Table compilee du fichier `source_path`, lue depuis le cache si elle est a
+    jour. Sinon `patterns_loader()` fournit les patterns a compiler et le
+    cache est reecrit.
+    """
+    source_path = Path(source_path)
+    stat = source_path.stat()
+    path = cache_path(source_path)
+    source_digest = None
+
+    try:
+        data = path.read_bytes()
+        magic, version, schema, mtime_ns, size, cached_digest, count = HEADER.unpack_from(data)
+        if (magic == MAGIC and version == FORMAT_VERSION and schema == SCHEMA_DIGEST
+                and len(data) == HEADER.size + count * RECORD.size):
+            fresh = mtime_ns == stat.st_mtime_ns and size == stat.st_size
+            if not fresh:
+                # Fichier touche mais peut-etre identique: on compare le hash.
+                source_digest = hashlib.sha1(source_path.read_bytes()).digest()
+                fresh = source_digest == cached_digest
+            if fresh:
+                packed = memoryview(data)[HEADER.size:]
+                compiled = CompiledLevel(list(RECORD.iter_unpack(packed)), packed)
+                if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+                    _write_cache(path, stat, source_digest, compiled)
+                return compiled
+    except (OSError, struct.error):
+        pass
+
+    compiled = compile_patterns(patterns_loader())
+    if source_digest is None:
+        source_digest = hashlib.sha1(source_path.read_bytes()).digest()
+    _write_cache(path, stat, source_digest, compiled)
+    return compiled
+
+
+def _write_cache(path, stat, source_digest, compiled):
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, SCHEMA_DIGEST,
+        stat.st_mtime_ns, stat.st_size, source_digest, len(compiled.records),
+    )
+    try:
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(header + pack_records(compiled.records))
+        tmp_path.replace(path)
+    except OSError:
+        # Dossier en lecture seule: le niveau reste utilisable sans cache.
+        pass
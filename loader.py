@@ -0,0 +1,58 @@
+"""
+Preparation des niveaux en arriere-plan.
+
+Ce module fournit `LevelLoader`, utilise par `main.py`:
+- les parties (`Simulation`: niveau compile, entites, joueur) sont construites
+  dans un thread, pendant que la boucle de jeu continue d'afficher,
+- le niveau suivant est prepare pendant l'ecran de fin de niveau, le niveau
+  selectionne pendant qu'il est en surbrillance dans le menu,
+- une partie deja prete demarre sans image d'attente; sinon le jeu affiche un
+  ecran de chargement jusqu'a ce qu'elle le soit.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from replay import ENDLESS_LEVEL
+from simulation import Simulation
+
+# Nombre maximal de parties preparees a l'avance (les plus anciennes sont
+# abandonnees, par exemple en parcourant le menu).
+PRELOAD_LIMIT = 4
+
+
+def build_simulation(level_index, seed=None):
+    if level_index == ENDLESS_LEVEL:
+        return Simulation(endless=True, seed=seed)
+    return Simulation(level_index, seed=seed)
+
+
+class LevelLoader:
+    def __init__(self, limit=PRELOAD_LIMIT):
+        self.limit = limit
+        # Un seul thread: les niveaux sont prepares dans l'ordre demande.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+        # (indice du niveau, graine) -> Future d'une Simulation neuve.
+        self._pending = {}
+
+    def preload(self, level_index, seed=None):
+        """Lance la preparation d'une partie si elle n'est pas deja en cours."""
+        key = (level_index, seed)
+        future = self._pending.get(key)
+        if future is None:
+            future = self._executor.submit(build_simulation, level_index, seed)
+            self._pending[key] = future
+            while len(self._pending) > self.limit:
+                oldest = next(iter(self._pending))
+                self._pending.pop(oldest).cancel()
+        return future
+
+    def take(self, level_index, seed=None):
+        """
+        Future de la partie demandee, retiree des preparations (une Simulation
+        ne sert qu'une fois). `future.done()` indique si elle est prete.
+        """
+        future = self.preload(level_index, seed)
+        del self._pending[(level_index, seed)]
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -6,86 +6,252 @@ Resume du projet:
 - Le joueur controle un cube qui avance dans des niveaux a obstacles.
 - Les portails changent la gravite (low/high/normal) et adaptent le saut.
 - Une interface d'accueil permet de choisir un niveau avant de jouer.
-- Le jeu gere les etats principaux: menu, partie, game over, fin de niveau,
-  et fin de campagne.
+- Un mode entrainement reprend la partie au dernier point de controle.
+- Le jeu gere les etats principaux: menu, chargement, partie, game over,
+  fin de niveau, et fin de campagne.
 
 Architecture:
 - `settings.py`: constantes et configuration globale.
-- `player.py`: logique du joueur (mouvement, saut, rotation, etat au sol).
+- `player.py`: logique du joueur (mouvement, saut, rotation, etat au sol,
+  collisions par balayage).
 - `level.py`: generation et cycle de niveaux.
+- `level_compiler.py`: tables d'entites compilees et leur cache disque.
+- `loader.py`: preparation des niveaux dans un thread (transitions sans attente).
+- `simulation.py`: logique d'une partie, executable sans affichage.
+- `practice.py`: mode entrainement (points de controle, retour en arriere).
+- `replay.py`: enregistrement et relecture deterministes des parties.
+- `solver.py`: verification de la faisabilite des niveaux.
+- `batch.py`: evaluation en lot de politiques de jeu, multi-processus.
+- `population.py`: population de joueurs simulee en parallele (NumPy).
+- `bench.py`: benchmarks des chemins critiques par image.
 - `obstacles.py`/`portals.py`: objets interactifs du decor.
 - `particles.py`: effets visuels (poussiere, portail).
+- `sprites.py`: cache LRU des sprites pre-rendus.
+- `texts.py`: polices et rendu de texte mis en cache.
+- `renderer.py`: rendu optionnel par rectangles sales (`--dirty-rects`).
+- `profiler.py`: temps par etape de l'image et panneau de profilage (`--profile`).
 - `utils.py`: fonctions utilitaires de rendu et de gameplay.
+
+Demarrage: seuls l'affichage puis, au premier texte, les polices sont
+initialises (pas d'audio); le catalogue des niveaux est lu depuis son index
+et aucun niveau n'est construit avant d'etre lance. `--startup-time` affiche
+la duree de chaque phase jusqu'a la premiere image.
 """
+import time
+
+STARTUP_START = time.perf_counter()
+
+import argparse
+import json
+import random
 import pygame
 import sys
 from settings import *
-from player import Player
 from level import Level
-from utils import draw_floor, update_gravity_and_jump, get_gravity_color
-
-pygame.init()
+from simulation import STATE_PLAYING, STATE_GAME_OVER, STATE_LEVEL_COMPLETE
+from utils import draw_background, draw_floor, get_background_layer, get_gravity_color
+from texts import render_text, draw_text, draw_number
+from renderer import DirtyRectRenderer
+from profiler import FrameProfiler
+from loader import LevelLoader
+from practice import PracticeSession
+from replay import Replay, ENDLESS_LEVEL
+
+parser = argparse.ArgumentParser(description="Geometry Dash")
+parser.add_argument(
+    "--fps",
+    type=int,
+    default=FPS,
+    help="cadence d'affichage (la physique reste a TICK_RATE images/s)",
+)
+parser.add_argument(
+    "--dirty-rects",
+    action="store_true",
+    help="ne redessine que les zones modifiees (materiel peu puissant)",
+)
+parser.add_argument(
+    "--record",
+    metavar="FICHIER",
+    help="enregistre le replay de chaque partie terminee dans FICHIER",
+)
+parser.add_argument(
+    "--replay",
+    metavar="FICHIER",
+    help="rejoue a l'ecran un replay enregistre avec --record",
+)
+parser.add_argument(
+    "--profile",
+    nargs="?",
+    const="",
+    metavar="FICHIER",
+    help="mesure chaque etape de l'image (F3: panneau); trace CSV/JSON ecrite dans FICHIER",
+)
+parser.add_argument(
+    "--startup-time",
+    action="store_true",
+    help="affiche la duree de chaque phase du demarrage et quitte apres la premiere image",
+)
+args = parser.parse_args()
+
+# Phases du demarrage: (nom, instant de fin), pour --startup-time.
+startup_phases = [("imports", time.perf_counter())]
+
+
+def startup_phase(name):
+    if args.startup_time:
+        startup_phases.append((name, time.perf_counter()))
+
+
+def report_startup():
+    previous = STARTUP_START
+    for name, instant in startup_phases:
+        print(f"{name:<14} {(instant - previous) * 1000:8.1f} ms")
+        previous = instant
+    print(f"{'total':<14} {(previous - STARTUP_START) * 1000:8.1f} ms")
+
+
+# Affichage uniquement: les polices demarrent au premier texte (texts.py) et
+# l'audio, inutilise, n'est jamais initialise.
+pygame.display.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Geometry Dash")
 clock = pygame.time.Clock()
-font = pygame.font.SysFont("Arial", 24)
-big_font = pygame.font.SysFont("Arial", 48)
+startup_phase("affichage")
+BIG_FONT_SIZE = 48
+
+overlay = pygame.Surface((WIDTH, HEIGHT))
+overlay.set_alpha(128)
+overlay.fill(BLACK)
+
+renderer = None
+if args.dirty_rects:
+    renderer = DirtyRectRenderer(screen, get_background_layer())
+last_view = None
+
+# Profileur des images: None sans --profile (aucun cout dans la boucle).
+profiler = FrameProfiler(args.fps, path=args.profile) if args.profile is not None else None
 
 STATE_MENU = "MENU"
-STATE_PLAYING = "PLAYING"
-STATE_GAME_OVER = "GAME_OVER"
-STATE_LEVEL_COMPLETE = "LEVEL_COMPLETE"
+STATE_LOADING = "LOADING"
 STATE_CAMPAIGN_COMPLETE = "CAMPAIGN_COMPLETE"
 
 selected_level = 0
 current_level_index = selected_level
 total_levels = Level.count()
 game_state = STATE_MENU
+startup_phase("catalogue")
+
+# Aucune partie avant le lancement d'un niveau (le menu n'en a pas besoin).
+simulation = None
+
+# Les parties sont preparees dans un thread; `loading` est la partie attendue
+# (etat LOADING).
+loader = LevelLoader()
+loading = None
+loading_frames = 0
 
-gravity = BASE_GRAVITY
-jump_power = BASE_JUMP_POWER
-current_gravity_effect = "NORMAL"
-score = 0
-dust_timer = 0
+# Mode entrainement: None en partie normale.
+practice = None
 
-player = Player()
-level = Level(current_level_index)
+# Mode infini: niveau procedural, meme graine a chaque redemarrage (R).
+endless_seed = 0
 
+# Replay en cours de lecture: les sauts viennent du fichier, pas du clavier.
+replay = Replay.load(args.replay) if args.replay else None
+replay_jumps = None
 
-def start_level(level_index):
-    global player
-    global level
+
+def start_level(level_index, seed=None):
+    """
+    Lance un niveau: immediatement si la partie a ete preparee, sinon apres
+    l'ecran de chargement (voir `finish_loading`).
+    """
     global current_level_index
-    global gravity
-    global jump_power
-    global current_gravity_effect
-    global score
-    global dust_timer
     global game_state
+    global replay_jumps
+    global loading
+    global loading_frames
 
     current_level_index = level_index
-    gravity = BASE_GRAVITY
-    jump_power = BASE_JUMP_POWER
-    current_gravity_effect = "NORMAL"
-    score = 0
-    dust_timer = 0
-    player = Player()
-    level = Level(current_level_index)
+    replay_jumps = None
+    if practice is not None:
+        practice.clear()
+    if level_index == ENDLESS_LEVEL:
+        seed = endless_seed
+    loading = loader.take(level_index, seed)
+    loading_frames = 0
+    game_state = STATE_LOADING
+    finish_loading()
+
+
+def finish_loading():
+    """Passe en jeu si la partie attendue est prete."""
+    global simulation
+    global game_state
+    global loading
+
+    if loading is None or not loading.done():
+        return
+    simulation = loading.result()
+    simulation.profiler = profiler
+    loading = None
     game_state = STATE_PLAYING
 
 
+def start_replay():
+    global endless_seed
+    global replay_jumps
+
+    endless_seed = replay.seed
+    start_level(replay.resolve_level(), seed=replay.seed)
+    replay_jumps = set(replay.jump_frames)
+
+
+def restart_level():
+    """Recommence la partie en cours: le niveau est remis a zero, pas reconstruit."""
+    global game_state
+
+    simulation.reset()
+    if practice is not None:
+        practice.clear()
+    game_state = STATE_PLAYING
+
+
+def enter_menu():
+    """Retour au menu: la partie du niveau selectionne se prepare de nouveau."""
+    global game_state
+
+    game_state = STATE_MENU
+    loader.preload(selected_level)
+
+
+def draw_loading():
+    """Ecran d'attente: nom du niveau et barre de progression animee."""
+    if current_level_index == ENDLESS_LEVEL:
+        name = "Mode infini"
+    else:
+        name = Level.get_name(current_level_index)
+    text = render_text(f"Chargement: {name}", WHITE)
+    screen.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 30)))
+
+    bar = pygame.Rect(0, 0, 300, 16)
+    bar.center = (WIDTH // 2, HEIGHT // 2 + 10)
+    pygame.draw.rect(screen, WHITE, bar, 2)
+    # Duree inconnue: un bloc fait des allers-retours dans la barre.
+    span = bar.width - 60
+    offset = loading_frames * 4 % (2 * span)
+    block_x = bar.left + (offset if offset < span else 2 * span - offset)
+    pygame.draw.rect(screen, CYAN, (block_x, bar.top + 3, 60, bar.height - 6))
+
+
 def draw_menu():
-    title = big_font.render("GEOMETRY DASH", True, CYAN)
-    subtitle = font.render("Selection du niveau", True, WHITE)
-    level_text = big_font.render(
-        f"Niveau {selected_level + 1}/{total_levels}",
-        True,
-        GREEN,
-    )
-    hint_1 = font.render("Gauche/Droite : changer de niveau", True, WHITE)
-    hint_2 = font.render("Entree/Espace : lancer", True, WHITE)
-    hint_3 = font.render("ECHAP : quitter", True, WHITE)
-    level_name_text = font.render(Level.get_name(selected_level), True, YELLOW)
+    title = render_text("GEOMETRY DASH", CYAN, BIG_FONT_SIZE)
+    subtitle = render_text("Selection du niveau", WHITE)
+    level_text = render_text(f"Niveau {selected_level + 1}/{total_levels}", GREEN, BIG_FONT_SIZE)
+    hint_1 = render_text("Gauche/Droite : changer de niveau", WHITE)
+    hint_2 = render_text("Entree/Espace : lancer | E : mode infini | P : entrainement", WHITE)
+    hint_3 = render_text("ECHAP : quitter", WHITE)
+    level_name_text = render_text(Level.get_name(selected_level), YELLOW)
 
     title_rect = title.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
     subtitle_rect = subtitle.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 40))
@@ -104,8 +270,156 @@ def draw_menu():
     screen.blit(hint_3, hint_3_rect)
 
 
+def floor_scroll():
+    # Le sol suit le defilement du niveau (fixe dans le menu).
+    if game_state in (STATE_MENU, STATE_LOADING):
+        return 0
+    return simulation.interpolate(alpha)[0]
+
+
+def draw_game():
+    """Dessine le niveau et le joueur; retourne les zones touchees."""
+    scroll, player_y = simulation.interpolate(alpha)
+    rects = simulation.level.draw(screen, GROUND_Y, scroll)
+    gravity_color = get_gravity_color(simulation.current_gravity_effect)
+    rects.append(simulation.player.draw(screen, gravity_color, player_y))
+    if practice is not None:
+        rects.extend(practice.draw(screen, scroll, simulation.player.size))
+    return rects
+
+
+def hud_fields():
+    player = simulation.player
+    fields = {
+        "score": simulation.score,
+        "level": (
+            "Niveau: infini" if current_level_index == ENDLESS_LEVEL
+            else f"Niveau: {current_level_index + 1}/{total_levels}"
+        ),
+        "jumps": f"Sauts: {player.jumps_remaining}/{player.max_jumps}",
+        "gravity": f"Gravite: {simulation.current_gravity_effect}",
+    }
+    if practice is not None:
+        fields["practice"] = (
+            f"Entrainement: {len(practice.checkpoints)} points, {practice.deaths} morts"
+        )
+    return fields
+
+
+def draw_score():
+    score_rect = draw_text(screen, "Score: ", (10, 10), CYAN)
+    return score_rect.union(draw_number(screen, simulation.score, (score_rect.right, 10), CYAN))
+
+
+def draw_hud(renderer=None):
+    fields = hud_fields()
+    draws = {
+        "score": draw_score,
+        "level": lambda: draw_text(screen, fields["level"], (10, 40), CYAN),
+        "jumps": lambda: draw_text(screen, fields["jumps"], (10, 70), CYAN),
+        "gravity": lambda: draw_text(screen, fields["gravity"], (10, 100), CYAN),
+        "practice": lambda: draw_text(screen, fields["practice"], (10, 130), GREEN),
+    }
+    for name, draw in draws.items():
+        if name not in fields:
+            continue
+        if renderer is None:
+            draw()
+        else:
+            renderer.field(name, fields[name], draw)
+
+
+def draw_overlay():
+    if game_state == STATE_GAME_OVER:
+        screen.blit(overlay, (0, 0))
+
+        game_over_text = render_text("GAME OVER", RED, BIG_FONT_SIZE)
+        restart_text = render_text("R: recommencer | Entree: menu", WHITE)
+
+        text_rect = game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
+        restart_rect = restart_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
+
+        screen.blit(game_over_text, text_rect)
+        screen.blit(restart_text, restart_rect)
+
+    elif game_state == STATE_LEVEL_COMPLETE:
+        complete_text = render_text("NIVEAU COMPLETE!", GREEN, BIG_FONT_SIZE)
+        score_text_end = render_text(f"Score final: {simulation.score}", WHITE)
+        next_hint = render_text("Entree/N: niveau suivant | R: rejouer", WHITE)
+
+        text_rect = complete_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 40))
+        score_rect = score_text_end.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+        next_rect = next_hint.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 40))
+
+        screen.blit(complete_text, text_rect)
+        screen.blit(score_text_end, score_rect)
+        screen.blit(next_hint, next_rect)
+
+    elif game_state == STATE_CAMPAIGN_COMPLETE:
+        complete_all = render_text("CAMPAGNE TERMINEE!", GREEN, BIG_FONT_SIZE)
+        end_hint = render_text("R: recommencer | Entree: menu", WHITE)
+
+        complete_rect = complete_all.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
+        hint_rect = end_hint.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
+
+        screen.blit(complete_all, complete_rect)
+        screen.blit(end_hint, hint_rect)
+
+
+def draw_dirty():
+    """Rendu par zones sales: seuls le jeu en cours et les changements d'ecran sont dessines."""
+    global last_view
+
+    view = (game_state, selected_level, current_level_index)
+    if view != last_view:
+        renderer.invalidate()
+        last_view = view
+    if game_state == STATE_LOADING:
+        # Barre animee: l'ecran de chargement est redessine a chaque image.
+        renderer.invalidate()
+    if game_state != STATE_PLAYING and not renderer.full_redraw:
+        # Ecran fige: rien n'a change depuis la derniere image.
+        return
+
+    in_menu = game_state in (STATE_MENU, STATE_LOADING)
+    renderer.begin_frame(None if in_menu else hud_fields())
+    renderer.add(draw_floor(screen, floor_scroll()))
+    if game_state == STATE_LOADING:
+        draw_loading()
+    elif in_menu:
+        draw_menu()
+    else:
+        renderer.add(draw_game())
+        if profiler is not None:
+            profiler.mark("draw")
+        draw_hud(renderer)
+        draw_overlay()
+    if profiler is not None:
+        profiler.mark("hud")
+        panel = profiler.draw(screen)
+        if panel is not None:
+            renderer.add(panel)
+        profiler.mark("overlay")
+    renderer.present()
+
+
+TICK = 1.0 / TICK_RATE
+accumulator = 0.0
+alpha = 1.0
+jump_requested = False
+
+if replay is not None:
+    start_replay()
+else:
+    loader.preload(selected_level)
+
 running = True
 while running:
+    # Pas fixe: la physique avance par tranches de TICK quel que soit le
+    # nombre d'images affichees; le reste sert a interpoler le rendu.
+    frame_time = min(clock.tick(args.fps) / 1000.0, MAX_FRAME_TIME)
+    if profiler is not None:
+        profiler.begin_frame()
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -113,161 +427,141 @@ while running:
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 running = False
+            elif event.key == pygame.K_F3 and profiler is not None:
+                profiler.toggle_overlay()
 
             if game_state == STATE_MENU:
                 if event.key == pygame.K_LEFT:
                     selected_level = (selected_level - 1) % total_levels
+                    loader.preload(selected_level)
                 elif event.key == pygame.K_RIGHT:
                     selected_level = (selected_level + 1) % total_levels
+                    loader.preload(selected_level)
                 elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                    practice = None
+                    start_level(selected_level)
+                elif event.key == pygame.K_p:
+                    practice = PracticeSession()
                     start_level(selected_level)
+                elif event.key == pygame.K_e:
+                    practice = None
+                    endless_seed = random.randrange(2**31)
+                    start_level(ENDLESS_LEVEL)
 
             elif game_state == STATE_PLAYING:
                 if event.key in (pygame.K_SPACE, pygame.K_UP):
-                    player.jump(jump_power)
+                    jump_requested = True
                 elif event.key == pygame.K_r:
-                    start_level(current_level_index)
+                    restart_level()
+                elif practice is not None:
+                    if event.key == pygame.K_c:
+                        practice.add_checkpoint(simulation)
+                    elif event.key == pygame.K_x:
+                        practice.remove_checkpoint()
+                    elif event.key == pygame.K_BACKSPACE:
+                        practice.rewind(simulation)
 
             elif game_state == STATE_GAME_OVER:
                 if event.key == pygame.K_r:
-                    start_level(current_level_index)
+                    restart_level()
                 elif event.key == pygame.K_RETURN:
-                    game_state = STATE_MENU
+                    enter_menu()
 
             elif game_state == STATE_LEVEL_COMPLETE:
                 if event.key == pygame.K_r:
-                    start_level(current_level_index)
+                    restart_level()
                 elif event.key in (pygame.K_RETURN, pygame.K_n):
                     if current_level_index < total_levels - 1:
                         selected_level = current_level_index + 1
                         start_level(selected_level)
                     else:
                         game_state = STATE_CAMPAIGN_COMPLETE
+                        # R relance la campagne depuis le premier niveau.
+                        loader.preload(0)
 
             elif game_state == STATE_CAMPAIGN_COMPLETE:
                 if event.key == pygame.K_r:
                     selected_level = 0
                     start_level(selected_level)
                 elif event.key == pygame.K_RETURN:
-                    game_state = STATE_MENU
+                    enter_menu()
 
+    if game_state == STATE_LOADING:
+        loading_frames += 1
+        finish_loading()
+
+    if profiler is not None:
+        profiler.mark("input")
+
+    steps = 0
     if game_state == STATE_PLAYING:
-        score += 1
-
-        player.update(gravity, level.obstacles)
-        if player.is_on_ground(level.obstacles) and abs(player.velocity_y) < 0.1:
-            dust_timer += 1
-            dust_interval = 4 if current_gravity_effect == "HIGH GRAVITY" else 6
-            if dust_timer >= dust_interval:
-                dust_intensity = 1.8 if current_gravity_effect == "HIGH GRAVITY" else 1.0
-                dust_color = DARK_PURPLE if current_gravity_effect == "HIGH GRAVITY" else None
-                level.create_dust_particles(
-                    player.x - 6,
-                    player.y + player.size - 2,
-                    color=dust_color,
-                    intensity=dust_intensity,
-                )
-                dust_timer = 0
-        else:
-            dust_timer = 0
-
-        if level.update(GAME_SPEED):
-            game_state = STATE_LEVEL_COMPLETE
-
-        player_hitbox = player.get_hitbox()
-        for obstacle in level.obstacles:
-            obs_hitbox = obstacle.get_hitbox(GROUND_Y)
-            if player_hitbox.colliderect(obs_hitbox):
-                if obstacle.type == "cube":
-                    if player.y + player.size > obs_hitbox.top + 5:
-                        game_state = STATE_GAME_OVER
+        accumulator += frame_time
+        while accumulator >= TICK and game_state == STATE_PLAYING:
+            # Un saut demande entre deux pas est applique au pas suivant.
+            if replay_jumps is not None:
+                jump_requested = simulation.frame in replay_jumps
+            game_state = simulation.step(jump_requested)
+            jump_requested = False
+            if practice is not None:
+                if game_state == STATE_GAME_OVER:
+                    practice.respawn(simulation)
+                    game_state = STATE_PLAYING
                 else:
-                    game_state = STATE_GAME_OVER
-
-        for portal in level.portals:
-            if player_hitbox.colliderect(portal.get_hitbox(GROUND_Y)) and not portal.activated:
-                gravity, jump_power, current_gravity_effect = update_gravity_and_jump(
-                    portal.gravity_multiplier,
-                    BASE_GRAVITY,
-                    BASE_JUMP_POWER,
-                )
-                portal.apply_effect()
-                portal_intensity = 1.6 if portal.portal_type == "high" else 1.0
-                level.create_portal_particles(
-                    portal.x + portal.width // 2,
-                    GROUND_Y - portal.height // 2 - 20,
-                    color=portal.color,
-                    intensity=portal_intensity,
-                )
-
-    screen.fill(BG_COLOR)
-    draw_floor(screen)
-
-    if game_state == STATE_MENU:
-        draw_menu()
+                    practice.record(simulation)
+            accumulator -= TICK
+            steps += 1
+        if game_state == STATE_LEVEL_COMPLETE and current_level_index + 1 < total_levels:
+            # Le niveau suivant se prepare pendant l'ecran de fin de niveau.
+            loader.preload(current_level_index + 1)
+        if game_state != STATE_PLAYING and args.record and practice is None:
+            Replay.from_simulation(simulation).save(args.record)
+        alpha = accumulator / TICK if game_state == STATE_PLAYING else 1.0
     else:
-        level.draw(screen, GROUND_Y)
-        gravity_color = get_gravity_color(current_gravity_effect)
-        player.draw(screen, gravity_color)
-
-        score_text = font.render(f"Score: {score}", True, CYAN)
-        level_text = font.render(
-            f"Niveau: {current_level_index + 1}/{total_levels}",
-            True,
-            CYAN,
-        )
-        jumps_text = font.render(
-            f"Sauts: {player.jumps_remaining}/{player.max_jumps}",
-            True,
-            CYAN,
-        )
-        gravity_text = font.render(f"Gravite: {current_gravity_effect}", True, CYAN)
-
-        screen.blit(score_text, (10, 10))
-        screen.blit(level_text, (10, 40))
-        screen.blit(jumps_text, (10, 70))
-        screen.blit(gravity_text, (10, 100))
-
-        if game_state == STATE_GAME_OVER:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill(BLACK)
-            screen.blit(overlay, (0, 0))
-
-            game_over_text = big_font.render("GAME OVER", True, RED)
-            restart_text = font.render("R: recommencer | Entree: menu", True, WHITE)
-
-            text_rect = game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
-            restart_rect = restart_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
-
-            screen.blit(game_over_text, text_rect)
-            screen.blit(restart_text, restart_rect)
-
-        elif game_state == STATE_LEVEL_COMPLETE:
-            complete_text = big_font.render("NIVEAU COMPLETE!", True, GREEN)
-            score_text_end = font.render(f"Score final: {score}", True, WHITE)
-            next_hint = font.render("Entree/N: niveau suivant | R: rejouer", True, WHITE)
-
-            text_rect = complete_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 40))
-            score_rect = score_text_end.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            next_rect = next_hint.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 40))
-
-            screen.blit(complete_text, text_rect)
-            screen.blit(score_text_end, score_rect)
-            screen.blit(next_hint, next_rect)
-
-        elif game_state == STATE_CAMPAIGN_COMPLETE:
-            complete_all = big_font.render("CAMPAGNE TERMINEE!", True, GREEN)
-            end_hint = font.render("R: recommencer | Entree: menu", True, WHITE)
-
-            complete_rect = complete_all.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
-            hint_rect = end_hint.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
-
-            screen.blit(complete_all, complete_rect)
-            screen.blit(end_hint, hint_rect)
-
-    pygame.display.flip()
-    clock.tick(FPS)
+        accumulator = 0.0
+        jump_requested = False
+        alpha = 1.0
+
+    if renderer is None:
+        draw_background(screen, floor_scroll())
+        if game_state == STATE_LOADING:
+            draw_loading()
+        elif game_state == STATE_MENU:
+            draw_menu()
+        else:
+            draw_game()
+            if profiler is not None:
+                profiler.mark("draw")
+            draw_hud()
+            draw_overlay()
+        if profiler is not None:
+            profiler.mark("hud")
+            profiler.draw(screen)
+            profiler.mark("overlay")
+        pygame.display.flip()
+    else:
+        draw_dirty()
 
+    if profiler is not None:
+        profiler.mark("flip")
+        if simulation is None:
+            profiler.end_frame(steps)
+        else:
+            level = simulation.level
+            profiler.end_frame(
+                steps,
+                len(level.visible_obstacles()) + len(level.visible_portals()),
+                len(level.particles),
+            )
+
+    if args.startup_time:
+        startup_phase("premiere image")
+        report_startup()
+        running = False
+
+if profiler is not None:
+    print(json.dumps(profiler.summary(), indent=2))
+    profiler.close()
+
+loader.shutdown()
 pygame.quit()
 sys.exit()
@@ -2,50 +2,76 @@
 Definition et rendu des obstacles.
 
 Ce module implemente la classe `Obstacle`:
-- selection des dimensions/couleurs selon le type,
+- dimensions, couleur et hitbox partagees par type (`ObstacleType`),
 - dessin des formes (pics, cube),
-- hitbox adaptee pour les collisions de gameplay,
-- deplacement horizontal avec la vitesse du jeu.
+- hitbox adaptee pour les collisions de gameplay.
+
+`x` est une position fixe dans le monde: le defilement est porte par le
+`scroll` du niveau, passe aux methodes de dessin et de collision.
 """
 import pygame
 from settings import *
+from sprites import obstacle_sprite
+
+# Hitboxes ajustées pour être plus permissives: retraits (gauche, haut,
+# droite) en pixels par rapport au sprite, le bas restant sur le sol.
+HITBOX_INSETS = {
+    "spike": (10, 15, 10),
+    "cube": (0, 0, 0),
+    "long_spike": (15, 10, 15),
+    "mini_spike": (5, 10, 5),
+}
+
+
+class ObstacleType:
+    """Donnees partagees par tous les obstacles d'un meme type."""
+
+    __slots__ = ("name", "width", "height", "color", "solid", "hitbox")
+
+    def __init__(self, name):
+        self.name = name
+        self.width = OBSTACLE_TYPES[name]["width"]
+        self.height = OBSTACLE_TYPES[name]["height"]
+        self.color = OBSTACLE_TYPES[name]["color"]
+        # Les cubes sont des plateformes: on peut se poser dessus.
+        self.solid = name == "cube"
+        # Hitbox precalculee: (dx, dy depuis le sol, largeur, hauteur).
+        left, top, right = HITBOX_INSETS[name]
+        self.hitbox = (left, -self.height + top, self.width - left - right, self.height - top)
+
+
+OBSTACLE_KINDS = {name: ObstacleType(name) for name in OBSTACLE_TYPES}
+
 
 class Obstacle:
+    # Une instance ne stocke que sa position et son type (pas de __dict__).
+    __slots__ = ("x", "kind")
+
     def __init__(self, x, obstacle_type):
         self.x = x
-        self.type = obstacle_type
-        self.width = OBSTACLE_TYPES[obstacle_type]["width"]
-        self.height = OBSTACLE_TYPES[obstacle_type]["height"]
-        self.color = OBSTACLE_TYPES[obstacle_type]["color"]
-    
-    def draw(self, surface, ground_y):
-        if self.type in ["spike", "long_spike", "mini_spike"]:
-            points = [(self.x + self.width//2, ground_y - self.height), 
-                     (self.x, ground_y), 
-                     (self.x + self.width, ground_y)]
-            pygame.draw.polygon(surface, self.color, points)
-            pygame.draw.polygon(surface, BLACK, points, 2)
-        
-        elif self.type == "cube":
-            pygame.draw.rect(surface, self.color, 
-                           (self.x, ground_y - self.height, self.width, self.height))
-            pygame.draw.rect(surface, BLACK, 
-                           (self.x, ground_y - self.height, self.width, self.height), 2)
-    
-    def get_hitbox(self, ground_y):
-        # Hitboxes ajustées pour être plus permissives
-        if self.type == "spike":
-            return pygame.Rect(self.x + 10, ground_y - self.height + 15, 
-                             self.width - 20, self.height - 15)
-        elif self.type == "cube":
-            return pygame.Rect(self.x, ground_y - self.height, 
-                             self.width, self.height)
-        elif self.type == "long_spike":
-            return pygame.Rect(self.x + 15, ground_y - self.height + 10, 
-                             self.width - 30, self.height - 10)
-        elif self.type == "mini_spike":
-            return pygame.Rect(self.x + 5, ground_y - self.height + 10, 
-                             self.width - 10, self.height - 10)
-    
-    def update(self, game_speed):
-        self.x -= game_speed
\ No newline at end of file
+        self.kind = OBSTACLE_KINDS[obstacle_type]
+
+    @property
+    def type(self):
+        return self.kind.name
+
+    @property
+    def width(self):
+        return self.kind.width
+
+    @property
+    def height(self):
+        return self.kind.height
+
+    @property
+    def color(self):
+        return self.kind.color
+
+    def draw(self, surface, ground_y, scroll=0):
+        kind = self.kind
+        sprite = obstacle_sprite(kind.name, kind.width, kind.height, kind.color)
+        return surface.blit(sprite, (self.x - scroll, ground_y - kind.height))
+
+    def get_hitbox(self, ground_y, scroll=0):
+        dx, dy, width, height = self.kind.hitbox
+        return pygame.Rect(self.x - scroll + dx, ground_y + dy, width, height)
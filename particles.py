@@ -1,56 +1,113 @@
 """
 Effets de particules.
 
-Ce module definit la classe `Particle` utilisee pour:
+Ce module definit le `ParticlePool` utilise pour:
 - la poussiere au contact du sol,
 - les effets visuels lors de l'activation des portails,
 - une animation simple avec vitesse, gravite locale et fade-out.
+
+Les particules ne sont pas des objets Python: leurs attributs sont ranges en
+colonnes NumPy de capacite fixe. Une image met a jour toutes les particules en
+quelques operations sur les colonnes; les particules mortes sont retirees par
+un masque, sans reallocation des colonnes.
 """
-import pygame
 import random
 
+import numpy as np
+
+from sprites import particle_sprite
+
+MAX_PARTICLES = 1024
+
+DEFAULT_COLORS = {
+    "dust": (170, 170, 170),
+    "portal": (220, 220, 220),
+}
+
 
-class Particle:
-    def __init__(self, x, y, color=None, kind="dust", intensity=1.0):
-        self.kind = kind
-        self.intensity = max(0.5, float(intensity))
-
-        if self.kind == "portal":
-            self.x = x + random.randint(-14, 14)
-            self.y = y + random.randint(-12, 12)
-            self.vx = random.uniform(-2.6, 2.6) * self.intensity
-            self.vy = random.uniform(-2.6, 2.6) * self.intensity
-            self.gravity = 0.03
-            self.size = random.uniform(2, 5) * min(1.8, self.intensity)
-            self.lifetime = int(34 * self.intensity)
-            self.color = color if color is not None else (220, 220, 220)
+class ParticlePool:
+    def __init__(self, capacity=MAX_PARTICLES, rng=None):
+        self.capacity = capacity
+        self.count = 0
+        # Generateur dedie: une graine fixe rend les effets reproductibles.
+        self.rng = rng if rng is not None else random.Random()
+        # Colonnes flottantes regroupees: une operation couvre plusieurs colonnes.
+        self._floats = np.zeros((6, capacity))
+        self.x, self.y, self.vx, self.vy, self.gravity, self.size = self._floats
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self._colors = np.zeros((3, capacity), dtype=np.uint8)
+        self.red, self.green, self.blue = self._colors
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, color=None, kind="dust", intensity=1.0):
+        """Ajoute une particule; ignoree si le pool est plein."""
+        if self.count >= self.capacity:
+            return
+        intensity = max(0.5, float(intensity))
+        i = self.count
+        self.count += 1
+        rng = self.rng
+
+        if kind == "portal":
+            self.x[i] = x + rng.randint(-14, 14)
+            self.y[i] = y + rng.randint(-12, 12)
+            self.vx[i] = rng.uniform(-2.6, 2.6) * intensity
+            self.vy[i] = rng.uniform(-2.6, 2.6) * intensity
+            self.gravity[i] = 0.03
+            self.size[i] = rng.uniform(2, 5) * min(1.8, intensity)
+            self.lifetime[i] = int(34 * intensity)
         else:
             # Poussiere: emission derriere le joueur, vers la gauche.
-            self.x = x + random.randint(-6, 2)
-            self.y = y + random.randint(-3, 2)
-            self.vx = random.uniform(-3.2, -0.6) * self.intensity
-            self.vy = random.uniform(-1.7, -0.2) * self.intensity
-            self.gravity = 0.09
-            self.size = random.uniform(1.8, 4.0) * min(1.6, self.intensity)
-            self.lifetime = int(24 * self.intensity)
-            self.color = color if color is not None else (170, 170, 170)
+            self.x[i] = x + rng.randint(-6, 2)
+            self.y[i] = y + rng.randint(-3, 2)
+            self.vx[i] = rng.uniform(-3.2, -0.6) * intensity
+            self.vy[i] = rng.uniform(-1.7, -0.2) * intensity
+            self.gravity[i] = 0.09
+            self.size[i] = rng.uniform(1.8, 4.0) * min(1.6, intensity)
+            self.lifetime[i] = int(24 * intensity)
+
+        red, green, blue = color if color is not None else DEFAULT_COLORS.get(kind, DEFAULT_COLORS["dust"])
+        self.red[i] = red
+        self.green[i] = green
+        self.blue[i] = blue
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += self.gravity
-        self.lifetime -= 1
-        self.size *= 0.97
+        """Integre toutes les particules et retire les particules mortes."""
+        count = self.count
+        if count == 0:
+            return
+        alive = self.lifetime[:count] > 1
+        if not alive.all():
+            count = int(np.count_nonzero(alive))
+            self._floats[:, :count] = self._floats[:, :self.count][:, alive]
+            self.lifetime[:count] = self.lifetime[:self.count][alive]
+            self._colors[:, :count] = self._colors[:, :self.count][:, alive]
+            self.count = count
+        floats = self._floats[:, :count]
+        # x += vx, y += vy, puis vy += gravite.
+        floats[0:2] += floats[2:4]
+        floats[3] += floats[4]
+        floats[5] *= 0.97
+        self.lifetime[:count] -= 1
 
     def draw(self, surface):
-        if self.lifetime > 0 and self.size > 0.2:
-            alpha = min(255, self.lifetime * 10)
-            radius = max(1, int(self.size))
-            particle_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(
-                particle_surf,
-                (*self.color, alpha),
-                (radius, radius),
-                radius,
-            )
-            surface.blit(particle_surf, (self.x - radius, self.y - radius))
+        """Dessine les particules et retourne les zones touchees."""
+        count = self.count
+        rects = []
+        columns = (
+            self.x[:count].tolist(), self.y[:count].tolist(), self.size[:count].tolist(),
+            self.lifetime[:count].tolist(), self._colors[:, :count].T.tolist(),
+        )
+        for x, y, size, lifetime, color in zip(*columns):
+            if size <= 0.2:
+                continue
+            alpha = min(255, lifetime * 10)
+            radius = max(1, int(size))
+            sprite = particle_sprite(radius, tuple(color), alpha)
+            rects.append(surface.blit(sprite, (x - radius, y - radius)))
+        return rects
@@ -3,12 +3,23 @@ Logique du joueur.
 
 Ce module gere:
 - la physique verticale (gravite/saut),
-- les collisions avec le sol et les cubes,
+- les collisions avec le sol et les cubes, testees sur tout le deplacement du
+  pas (balayage): aucun cube n'est traverse, quelles que soient la vitesse
+  et la gravite,
 - la rotation visuelle du cube,
 - l'etat "au sol" utilise pour certains effets (ex: poussiere).
 """
+import math
+
 import pygame
 from settings import *
+from sprites import cube_sprite
+from utils import sweep_aabb
+
+def _platforms(obstacles, scroll):
+    """Hitboxes (ecran) des obstacles sur lesquels on peut se poser."""
+    return [obs.get_hitbox(GROUND_Y, scroll) for obs in obstacles if obs.kind.solid]
+
 
 class Player:
     def __init__(self):
@@ -30,26 +41,40 @@ class Player:
             if self.jumps_remaining == 0:
                 self.rotation = 30
     
-    def update(self, gravity, obstacles):
+    def update(self, gravity, obstacles, scroll=0, speed=0):
+        """
+        Avance le joueur d'un pas. `speed` est son avance horizontale dans le
+        monde pendant ce pas (le defilement): les cubes de `obstacles` sont
+        testes sur tout le deplacement (speed, velocity_y).
+        """
         # 1. Appliquer la gravité
         self.velocity_y += gravity
+        start_y = self.y
         self.y += self.velocity_y
         
         landed_on_cube = False
-        player_rect = self.get_hitbox()
 
-        # 2. Gestion des collisions avec les Cubes (Plateformes)
-        for obs in obstacles:
-            if obs.type == "cube":
-                obs_rect = obs.get_hitbox(GROUND_Y)
-                if player_rect.colliderect(obs_rect):
-                    # Si on tombe sur le dessus du cube
-                    if self.velocity_y >= 0 and (self.y + self.size) <= (obs_rect.top + self.velocity_y + 10):
-                        self.y = obs_rect.top - self.size
-                        self.velocity_y = 0
-                        self.is_jumping = False
-                        self.jumps_remaining = self.max_jumps
-                        landed_on_cube = True
+        # 2. Gestion des collisions avec les Cubes (Plateformes): premier
+        # contact du deplacement, a l'instant d'impact. Les candidats sont
+        # filtres en un seul appel `collidelistall` sur la zone balayee.
+        if self.velocity_y >= 0:
+            landing = None
+            platforms = _platforms(obstacles, scroll)
+            for index in self.get_swept_hitbox(start_y, speed).collidelistall(platforms):
+                obs_rect = platforms[index]
+                t = sweep_aabb(self.x, start_y, self.size, self.size, speed, self.velocity_y, obs_rect)
+                if t is None:
+                    continue
+                # Si on tombe sur le dessus du cube (ou on le gravit)
+                if start_y + self.velocity_y * t + self.size <= obs_rect.top + STEP_UP:
+                    if landing is None or (t, obs_rect.top) < landing:
+                        landing = (t, obs_rect.top)
+            if landing is not None:
+                self.y = landing[1] - self.size
+                self.velocity_y = 0
+                self.is_jumping = False
+                self.jumps_remaining = self.max_jumps
+                landed_on_cube = True
 
         # 3. Vérifier le sol
         was_in_air = self.y < GROUND_Y - self.size
@@ -81,7 +106,16 @@ class Player:
     def get_hitbox(self):
         return pygame.Rect(self.x, self.y, self.size, self.size)
 
-    def is_on_ground(self, obstacles):
+    def get_swept_hitbox(self, start_y, dx):
+        """
+        Rectangle (ecran, camera du debut du pas) couvrant tout le deplacement
+        du pas: de (x, start_y) a (x + dx, y).
+        """
+        top = math.floor(min(start_y, self.y))
+        bottom = math.ceil(max(start_y, self.y)) + self.size
+        return pygame.Rect(self.x, top, self.size + dx, bottom - top)
+
+    def is_on_ground(self, obstacles, scroll=0):
         if self.y >= GROUND_Y - self.size - 0.1:
             return True
 
@@ -93,26 +127,34 @@ class Player:
             3,
         )
 
-        for obs in obstacles:
-            if obs.type != "cube":
-                continue
-            obs_rect = obs.get_hitbox(GROUND_Y)
-            if feet_rect.colliderect(obs_rect) and abs(player_rect.bottom - obs_rect.top) <= 6:
+        platforms = _platforms(obstacles, scroll)
+        for index in feet_rect.collidelistall(platforms):
+            if abs(player_rect.bottom - platforms[index].top) <= 6:
                 return True
         return False
     
     def reset(self):
+        """Etat initial (redemarrage sans recreer le joueur)."""
         self.y = GROUND_Y - self.size
         self.velocity_y = 0
+        self.rotation = 0
+        self.is_jumping = False
         self.jumps_remaining = self.max_jumps
         self.gravity_effect = "NORMAL"
+
+    def snapshot(self):
+        """Etat du joueur en tuple (voir `Simulation.snapshot`)."""
+        return (self.y, self.velocity_y, self.rotation, self.is_jumping,
+                self.jumps_remaining, self.gravity_effect)
+
+    def restore(self, snapshot):
+        (self.y, self.velocity_y, self.rotation, self.is_jumping,
+         self.jumps_remaining, self.gravity_effect) = snapshot
     
-    def draw(self, surface, gravity_color):
-        player_surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-        
-        # Dessiner le cube
-        pygame.draw.rect(player_surface, BLACK, (0, 0, self.size, self.size))
-        
+    def draw(self, surface, gravity_color, y=None):
+        # `y` permet de dessiner a une position interpolee (rendu a pas fixe)
+        if y is None:
+            y = self.y
         # Ajuster la couleur selon les sauts restants
         if self.jumps_remaining == 2:
             color = gravity_color
@@ -121,35 +163,15 @@ class Player:
         else:
             color = tuple(min(255, c + 100) for c in gravity_color)
         
-        padding = 4
-        pygame.draw.rect(
-            player_surface,
-            color,
-            (padding, padding, self.size - padding*2, self.size - padding*2)
-        )
-        
-        inner_padding = self.size // 3
-        pygame.draw.rect(
-            player_surface,
-            BLACK,
-            (inner_padding, inner_padding, self.size - inner_padding*2, self.size - inner_padding*2)
-        )
-        
-        core_padding = int(self.size / 2.5)
-        pygame.draw.rect(
-            player_surface,
-            color,
-            (core_padding, core_padding, self.size - core_padding*2, self.size - core_padding*2)
-        )
-        
-        # Rotation
-        rotated_surface = pygame.transform.rotate(player_surface, self.rotation)
-        rect = rotated_surface.get_rect(center=(self.x + self.size//2, self.y + self.size//2))
-        surface.blit(rotated_surface, rect.topleft)
+        # Rotation (sprite pre-rendu par paliers de 2 degres)
+        rotated_surface = cube_sprite(self.size, color, self.rotation)
+        rect = rotated_surface.get_rect(center=(self.x + self.size//2, y + self.size//2))
+        dirty = surface.blit(rotated_surface, rect.topleft)
         
         # Afficher les sauts restants
         for i in range(self.jumps_remaining):
             circle_x = self.x + 10 + i * 15
-            circle_y = self.y - 10
-            pygame.draw.circle(surface, color, (circle_x, circle_y), 5)
-            pygame.draw.circle(surface, BLACK, (circle_x, circle_y), 5, 1)
\ No newline at end of file
+            circle_y = y - 10
+            dirty.union_ip(pygame.draw.circle(surface, color, (circle_x, circle_y), 5))
+            pygame.draw.circle(surface, BLACK, (circle_x, circle_y), 5, 1)
+        return dirty
\ No newline at end of file
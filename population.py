@@ -0,0 +1,321 @@
+"""
+Simulation d'une population de joueurs en parallele.
+
+Ce module fait avancer des milliers de joueurs independants dans le meme
+niveau, image par image (entrainement d'IA, analyse de difficulte):
+- l'etat des joueurs est range en tableaux NumPy (y, vitesse, sauts restants,
+  gravite et saut propres a chaque joueur, vivant/termine),
+- le niveau n'est interroge qu'une fois par image pour tous les joueurs
+  (`Level.obstacle_collisions_many`); chaque obstacle n'est ensuite teste
+  qu'avec les joueurs dont la zone balayee le chevauche,
+- la physique et les collisions de `Simulation` (balayage, instant d'impact)
+  sont reproduites a l'identique, en operations vectorisees sur tous les
+  joueurs.
+
+Usage: `python population.py --agents 5000 --prob 0.05 0 1 2`.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from settings import (
+    BASE_GRAVITY, BASE_JUMP_POWER, GAME_SPEED, GROUND_Y, MAX_JUMPS, PLAYER_SIZE, PLAYER_X, STEP_UP,
+)
+from level import CULL_X, Level, get_compiled_level
+from level_compiler import ENTITY_TYPES, PORTAL_TYPE_IDS
+from obstacles import OBSTACLE_KINDS
+from portals import PORTAL_KINDS
+from simulation import STATE_GAME_OVER, STATE_LEVEL_COMPLETE, STATE_PLAYING
+from utils import update_gravity_and_jump
+
+# Codes d'etat par joueur.
+PLAYING = 0
+GAME_OVER = 1
+LEVEL_COMPLETE = 2
+STATE_NAMES = {PLAYING: STATE_PLAYING, GAME_OVER: STATE_GAME_OVER, LEVEL_COMPLETE: STATE_LEVEL_COMPLETE}
+EFFECTS = ("NORMAL", "LOW GRAVITY", "HIGH GRAVITY")
+
+
+def sweep(left, top, dx, dy, rect_left, rect_top, rect_right, rect_bottom):
+    """
+    `utils.sweep_aabb` pour tous les joueurs a la fois: x et dx communs, `top`
+    et `dy` par joueur. Retourne les instants d'impact (inf: pas de contact).
+    """
+    size = len(top)
+    if dx == 0:
+        if left >= rect_right or left + PLAYER_SIZE <= rect_left:
+            return np.full(size, np.inf)
+        t_entry, t_exit = 0.0, 1.0
+    else:
+        t0 = (rect_left - left - PLAYER_SIZE) / dx
+        t1 = (rect_right - left) / dx
+        t_entry = max(min(t0, t1), 0.0)
+        t_exit = min(max(t0, t1), 1.0)
+    # Sans deplacement vertical (dy == 0), la division donne -inf/+inf quand
+    # les boites se chevauchent en y, et +inf, -inf ou nan sinon: aucun
+    # contact dans ce cas, les comparaisons avec nan etant fausses.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (rect_top - top - PLAYER_SIZE) / dy
+        t1 = (rect_bottom - top) / dy
+        entry = np.maximum(np.minimum(t0, t1), t_entry)
+        exit = np.minimum(np.maximum(t0, t1), t_exit)
+        return np.where(entry < exit, entry, np.inf)
+
+
+class LevelTable:
+    """
+    Hitboxes monde des obstacles et portails d'un niveau compile, en colonnes
+    NumPy indexees comme `Level.obstacles` / `Level.portals`.
+    """
+
+    def __init__(self, compiled):
+        obstacles = [record for record in compiled.records if record[0] not in PORTAL_TYPE_IDS]
+        portals = [record for record in compiled.records if record[0] in PORTAL_TYPE_IDS]
+
+        def columns(records):
+            table = np.array([record[2:] for record in records], dtype=np.int64).reshape(-1, 4)
+            left, top, width, height = table.T
+            return left, top, left + width, top + height
+
+        (self.obstacle_left, self.obstacle_top,
+         self.obstacle_right, self.obstacle_bottom) = columns(obstacles)
+        self.obstacle_solid = np.array(
+            [OBSTACLE_KINDS[ENTITY_TYPES[record[0]]].solid for record in obstacles], dtype=bool)
+
+        (self.portal_left, self.portal_top,
+         self.portal_right, self.portal_bottom) = columns(portals)
+        # Gravite, saut et effet de chaque portail (memes calculs que `Simulation`).
+        effects = []
+        for record in portals:
+            kind = PORTAL_KINDS[ENTITY_TYPES[record[0]].replace("portal_", "")]
+            gravity, jump_power, effect = update_gravity_and_jump(kind.multiplier, BASE_GRAVITY, BASE_JUMP_POWER)
+            effects.append((gravity, jump_power, EFFECTS.index(effect)))
+        self.portal_gravity = np.array([effect[0] for effect in effects], dtype=float)
+        self.portal_jump_power = np.array([effect[1] for effect in effects], dtype=float)
+        self.portal_effect = np.array([effect[2] for effect in effects], dtype=np.int8)
+
+        # Le niveau est termine quand la derniere entite sort a gauche.
+        last_x = max((record[1] for record in compiled.records), default=None)
+        self.end_scroll = 0 if last_x is None else last_x - CULL_X
+
+
+def _swept_boxes(start_y, end_y):
+    # Zones balayees (ecran, camera du debut de l'image) de joueurs allant de
+    # `start_y` a `end_y`: memes bords que `Player.get_swept_hitbox`.
+    count = len(start_y)
+    left = np.broadcast_to(float(PLAYER_X), count)
+    right = np.broadcast_to(float(PLAYER_X + PLAYER_SIZE + GAME_SPEED), count)
+    top = np.floor(np.minimum(start_y, end_y))
+    bottom = np.ceil(np.maximum(start_y, end_y)) + PLAYER_SIZE
+    return left, top, right, bottom
+
+
+class Population:
+    def __init__(self, level_index=0, size=1000):
+        self.level_index = level_index
+        self.size = size
+        self.table = LevelTable(get_compiled_level(level_index))
+        # Niveau complet (sans streaming) pour les requetes de collision.
+        self.level = Level(level_index)
+        self.reset()
+
+    def reset(self):
+        size = self.size
+        self.y = np.full(size, float(GROUND_Y - PLAYER_SIZE))
+        self.velocity_y = np.zeros(size)
+        self.jumps_remaining = np.full(size, MAX_JUMPS, dtype=np.int8)
+        self.gravity = np.full(size, float(BASE_GRAVITY))
+        self.jump_power = np.full(size, float(BASE_JUMP_POWER))
+        self.effect = np.zeros(size, dtype=np.int8)
+        self.state = np.full(size, PLAYING, dtype=np.int8)
+        # Image de fin et obstacle fatal (-1: aucun) de chaque joueur.
+        self.end_frame = np.zeros(size, dtype=np.int32)
+        self.death_obstacle = np.full(size, -1, dtype=np.int32)
+        self.scroll = 0
+        self.frame = 0
+
+    def select(self, indices):
+        """
+        Ne garde que les joueurs `indices`, dans cet ordre; un indice repete
+        donne des copies qui jouent ensuite chacune de leur cote (branches
+        et fusions d'etats du solveur).
+        """
+        for name in ("y", "velocity_y", "jumps_remaining", "gravity", "jump_power",
+                     "effect", "state", "end_frame", "death_obstacle"):
+            setattr(self, name, getattr(self, name)[indices])
+        self.size = len(indices)
+
+    @property
+    def alive(self):
+        return self.state == PLAYING
+
+    @property
+    def running(self):
+        return bool(self.alive.any())
+
+    def step(self, jumps=None):
+        """
+        Avance tous les joueurs vivants d'une image. `jumps` est un tableau de
+        booleens (un saut demande par joueur) ou None.
+        """
+        alive = self.alive
+        y = self.y
+        velocity_y = self.velocity_y
+        jumps_remaining = self.jumps_remaining
+        table = self.table
+
+        if jumps is not None:
+            jumping = alive & jumps & (jumps_remaining > 0)
+            velocity_y[jumping] = self.jump_power[jumping]
+            jumps_remaining[jumping] -= 1
+
+        self.frame += 1
+
+        # Physique du joueur (Player.update): gravite puis plateformes, au
+        # premier contact du deplacement (GAME_SPEED, vitesse).
+        level = self.level
+        level.seek(self.scroll)
+        players = np.flatnonzero(alive)
+        new_velocity = velocity_y + self.gravity
+        new_y = y + new_velocity
+        start_left = PLAYER_X + self.scroll
+        landing_t = np.full(self.size, np.inf)
+        landing_top = np.zeros(self.size)
+        # La position finale (posee, ou au sol) reste entre y et new_y: la zone
+        # balayee de y a new_y couvre aussi les tests d'impact et de portail,
+        # et le niveau n'est interroge qu'une fois par type d'entite.
+        boxes = _swept_boxes(y[players], new_y[players])
+        indices, overlap = level.obstacle_collisions_many(*boxes)
+        with np.errstate(invalid="ignore"):
+            for column, i in enumerate(indices):
+                if not table.obstacle_solid[i]:
+                    continue
+                agents = players[overlap[column]]
+                platform_top = table.obstacle_top[i]
+                start, velocity = y[agents], new_velocity[agents]
+                t = sweep(start_left, start, GAME_SPEED, velocity, table.obstacle_left[i],
+                          platform_top, table.obstacle_right[i], table.obstacle_bottom[i])
+                best_t, best_top = landing_t[agents], landing_top[agents]
+                landing = (
+                    (velocity >= 0) & (start + velocity * t + PLAYER_SIZE <= platform_top + STEP_UP)
+                    & ((t < best_t) | ((t == best_t) & (platform_top < best_top)))
+                )
+                landing_t[agents[landing]] = t[landing]
+                landing_top[agents[landing]] = platform_top
+        landed = np.isfinite(landing_t)
+        new_y[landed] = landing_top[landed] - PLAYER_SIZE
+        new_velocity[landed] = 0
+        jumps_remaining[landed] = MAX_JUMPS
+        grounded = new_y >= GROUND_Y - PLAYER_SIZE
+        new_y[grounded] = GROUND_Y - PLAYER_SIZE
+        new_velocity[grounded] = 0
+        jumps_remaining[grounded & alive] = MAX_JUMPS
+        start_y = y.copy()
+        y[alive] = new_y[alive]
+        velocity_y[alive] = new_velocity[alive]
+        dy = y - start_y
+
+        # Defilement commun.
+        self.scroll += GAME_SPEED
+        if self.scroll >= table.end_scroll:
+            self.state[alive] = LEVEL_COMPLETE
+
+        # Collisions avec les obstacles sur tout le deplacement de l'image: le
+        # premier obstacle touche est fatal (a egalite, le premier du niveau).
+        impact_t = np.full(self.size, np.inf)
+        impact_index = np.full(self.size, -1, dtype=np.int32)
+        with np.errstate(invalid="ignore"):
+            for column, i in enumerate(indices):
+                agents = players[overlap[column]]
+                obstacle_top = table.obstacle_top[i]
+                start, move = start_y[agents], dy[agents]
+                t = sweep(start_left, start, GAME_SPEED, move, table.obstacle_left[i],
+                          obstacle_top, table.obstacle_right[i], table.obstacle_bottom[i])
+                hit = t < impact_t[agents]
+                if table.obstacle_solid[i]:
+                    hit &= start + move * t + PLAYER_SIZE > obstacle_top + STEP_UP
+                impact_t[agents[hit]] = t[hit]
+                impact_index[agents[hit]] = i
+        dead = np.isfinite(impact_t)
+        self.death_obstacle[dead] = impact_index[dead]
+        self.state[dead] = GAME_OVER
+
+        # Portails: re-traverser un portail deja active ne change rien, le
+        # drapeau `activated` par joueur est donc inutile.
+        indices, overlap = level.portal_collisions_many(*boxes)
+        for column, i in enumerate(indices):
+            agents = players[overlap[column]]
+            t = sweep(start_left, start_y[agents], GAME_SPEED, dy[agents], table.portal_left[i],
+                      table.portal_top[i], table.portal_right[i], table.portal_bottom[i])
+            hit = agents[np.isfinite(t)]
+            self.gravity[hit] = table.portal_gravity[i]
+            self.jump_power[hit] = table.portal_jump_power[i]
+            self.effect[hit] = table.portal_effect[i]
+
+        self.end_frame[alive] = self.frame
+
+    def run(self, policy, max_frames=None):
+        """Joue jusqu'a ce que tous les joueurs aient fini (`policy(population)` -> sauts)."""
+        while self.running:
+            if max_frames is not None and self.frame >= max_frames:
+                break
+            self.step(policy(self))
+
+    def summary(self):
+        completed = self.state == LEVEL_COMPLETE
+        deaths = self.death_obstacle[self.state == GAME_OVER]
+        counts = np.bincount(deaths) if len(deaths) else np.zeros(0, dtype=np.int64)
+        order = np.argsort(counts)[::-1]
+        return {
+            "level": self.level_index,
+            "agents": self.size,
+            "completed": int(completed.sum()),
+            "completion_rate": float(completed.mean()),
+            "frames_mean": float(self.end_frame.mean()),
+            "frames_max": int(self.end_frame.max(initial=0)),
+            "deaths": {int(i): int(counts[i]) for i in order if counts[i]},
+        }
+
+
+class RandomJumps:
+    """Chaque joueur saute avec la probabilite `probability` a chaque image."""
+
+    def __init__(self, probability=0.05, seed=None):
+        self.probability = probability
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, population):
+        return self.rng.random(population.size) < self.probability
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simule une population de joueurs dans un niveau")
+    parser.add_argument("levels", nargs="*", type=int, help="indices des niveaux (defaut: tous)")
+    parser.add_argument("--agents", type=int, default=1000, help="joueurs par niveau")
+    parser.add_argument("--prob", type=float, default=0.05, help="probabilite de saut par image")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    for level_index in args.levels or range(Level.count()):
+        population = Population(level_index, args.agents)
+        start = time.perf_counter()
+        population.run(RandomJumps(args.prob, args.seed), args.max_frames)
+        elapsed = time.perf_counter() - start
+        summary = population.summary()
+        worst = ", ".join(f"#{index}: {count}" for index, count in list(summary["deaths"].items())[:5])
+        agent_frames = int(population.end_frame.sum())
+        print(
+            f"[{level_index + 1}] {Level.get_name(level_index)}: "
+            f"{summary['completion_rate']:.1%} reussite, images moy {summary['frames_mean']:.0f} "
+            f"({agent_frames / elapsed / 1e6:.2f} M images-joueur/s)"
+        )
+        if worst:
+            print(f"    morts par obstacle: {worst}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,60 +3,91 @@ Portails de gravite.
 
 Ce module fournit la classe `GravityPortal`:
 - apparence et animation du portail,
-- hitbox de declenchement,
-- transport de l'effet de gravite applique au joueur,
-- deplacement dans le decor defilant.
+- type partage (`PortalType`): dimensions, effet et hitbox de declenchement,
+- transport de l'effet de gravite applique au joueur.
+
+`x` est une position fixe dans le monde: le defilement est porte par le
+`scroll` du niveau, passe aux methodes de dessin et de collision.
 """
 import pygame
 import math
 from settings import *
+from sprites import portal_sprite
+from texts import render_text
+
+PORTAL_WIDTH = 40
+PORTAL_HEIGHT = 60
+
+
+class PortalType:
+    """Donnees partagees par tous les portails d'un meme type."""
+
+    __slots__ = ("name", "width", "height", "multiplier", "color", "effect", "hitbox")
+
+    def __init__(self, name):
+        self.name = name
+        self.width = PORTAL_WIDTH
+        self.height = PORTAL_HEIGHT
+        self.multiplier = PORTAL_TYPES[name]["multiplier"]
+        self.color = PORTAL_TYPES[name]["color"]
+        self.effect = PORTAL_TYPES[name]["name"]
+        # Hitbox precalculee: (dx, dy depuis le sol, largeur, hauteur).
+        self.hitbox = (0, -self.height - 20, self.width, self.height)
+
+
+PORTAL_KINDS = {name: PortalType(name) for name in PORTAL_TYPES}
+
 
 class GravityPortal:
+    __slots__ = ("x", "kind", "activated", "animation_offset")
+
     def __init__(self, x, portal_type):
         self.x = x
-        self.width = 40
-        self.height = 60
-        self.portal_type = portal_type
-        self.gravity_multiplier = PORTAL_TYPES[portal_type]["multiplier"]
-        self.color = PORTAL_TYPES[portal_type]["color"]
-        self.effect = PORTAL_TYPES[portal_type]["name"]
+        self.kind = PORTAL_KINDS[portal_type]
         self.activated = False
         self.animation_offset = 0
-    
-    def draw(self, surface, ground_y):
+
+    @property
+    def portal_type(self):
+        return self.kind.name
+
+    @property
+    def width(self):
+        return self.kind.width
+
+    @property
+    def height(self):
+        return self.kind.height
+
+    @property
+    def gravity_multiplier(self):
+        return self.kind.multiplier
+
+    @property
+    def color(self):
+        return self.kind.color
+
+    @property
+    def effect(self):
+        return self.kind.effect
+
+    def draw(self, surface, ground_y, scroll=0):
+        kind = self.kind
+        x = self.x - scroll
         self.animation_offset = (self.animation_offset + 0.2) % (2 * math.pi)
-        portal_y = ground_y - self.height//2 - 20
-        
-        # Corps du portail
-        pygame.draw.ellipse(surface, self.color, 
-                          (self.x, portal_y, self.width, self.height))
-        pygame.draw.ellipse(surface, BLACK, 
-                          (self.x, portal_y, self.width, self.height), 2)
+        portal_y = ground_y - kind.height//2 - 20
         
-        # Anneau intérieur tournant
-        inner_width = self.width - 10
-        inner_height = self.height - 10
-        inner_x = self.x + 5
-        inner_y = portal_y + 5
-        
-        num_points = 8
-        for i in range(num_points):
-            angle = (2 * math.pi * i / num_points) + self.animation_offset
-            point_x = inner_x + inner_width//2 + math.cos(angle) * (inner_width//3)
-            point_y = inner_y + inner_height//2 + math.sin(angle) * (inner_height//3)
-            pygame.draw.circle(surface, BLACK, (int(point_x), int(point_y)), 3)
+        sprite = portal_sprite(kind.width, kind.height, kind.color, self.animation_offset)
+        rect = surface.blit(sprite, (x, portal_y))
         
         # Texte d'effet
-        font = pygame.font.SysFont("Arial", 12)
-        text = font.render(self.effect, True, WHITE)
-        text_rect = text.get_rect(center=(self.x + self.width//2, portal_y - 15))
-        surface.blit(text, text_rect)
+        text = render_text(kind.effect, WHITE, 12)
+        text_rect = text.get_rect(center=(x + kind.width//2, portal_y - 15))
+        return rect.union(surface.blit(text, text_rect))
     
-    def get_hitbox(self, ground_y):
-        return pygame.Rect(self.x, ground_y - self.height - 20, self.width, self.height)
+    def get_hitbox(self, ground_y, scroll=0):
+        dx, dy, width, height = self.kind.hitbox
+        return pygame.Rect(self.x - scroll + dx, ground_y + dy, width, height)
     
     def apply_effect(self):
         self.activated = True
-    
-    def update(self, game_speed):
-        self.x -= game_speed
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Mode entrainement.
+
+Ce module fournit `PracticeSession`, utilise par `main.py` (touche P du menu):
+- points de controle poses (C) ou retires (X) en cours de partie: ce sont des
+  instantanes de la `Simulation` (`snapshot()`), sans copie du niveau,
+- apres une mort, la partie reprend au dernier point de controle (ou au debut),
+- un historique glissant d'instantanes permet de revenir en arriere
+  (Retour arriere: environ une seconde par appui),
+- les parties d'entrainement ne sont pas enregistrees en replay.
+"""
+from collections import deque
+
+import pygame
+
+from settings import GREEN, TICK_RATE, WHITE
+
+# Un instantane d'historique toutes les REWIND_INTERVAL images, gardes sur
+# REWIND_SECONDS secondes de jeu.
+REWIND_INTERVAL = TICK_RATE // 4
+REWIND_SECONDS = 10
+# Recul d'un appui sur Retour arriere, en images.
+REWIND_FRAMES = TICK_RATE
+MARKER_SIZE = 8
+
+
+def _frame(snapshot):
+    # Premier champ d'un `Simulation.snapshot()`.
+    return snapshot[0]
+
+
+class PracticeSession:
+    def __init__(self):
+        self.checkpoints = []
+        # Position monde (x, y) du joueur a chaque point de controle (affichage).
+        self.markers = []
+        self.history = deque(maxlen=REWIND_SECONDS * TICK_RATE // REWIND_INTERVAL)
+        self.deaths = 0
+
+    def clear(self):
+        self.checkpoints.clear()
+        self.markers.clear()
+        self.history.clear()
+        self.deaths = 0
+
+    def record(self, simulation):
+        """Appele apres chaque pas de simulation: alimente l'historique."""
+        if simulation.running and simulation.frame % REWIND_INTERVAL == 0:
+            self.history.append(simulation.snapshot())
+
+    def add_checkpoint(self, simulation):
+        if not simulation.running:
+            return
+        self.checkpoints.append(simulation.snapshot())
+        player = simulation.player
+        self.markers.append((player.x + simulation.level.scroll, player.y))
+
+    def remove_checkpoint(self):
+        if self.checkpoints:
+            self.checkpoints.pop()
+            self.markers.pop()
+
+    def respawn(self, simulation):
+        """Apres une mort: reprise au dernier point de controle, sinon au debut."""
+        self.deaths += 1
+        if self.checkpoints:
+            self._restore(simulation, self.checkpoints[-1])
+        else:
+            simulation.reset()
+            self.history.clear()
+
+    def rewind(self, simulation):
+        """Recule d'environ REWIND_FRAMES images (pas avant l'historique)."""
+        target = simulation.frame - REWIND_FRAMES
+        while len(self.history) > 1 and _frame(self.history[-1]) > target:
+            self.history.pop()
+        if self.history:
+            self._restore(simulation, self.history[-1])
+
+    def _restore(self, simulation, snapshot):
+        simulation.restore(snapshot)
+        # L'historique posterieur appartient a la branche abandonnee.
+        while self.history and _frame(self.history[-1]) > simulation.frame:
+            self.history.pop()
+
+    def draw(self, surface, scroll, size):
+        """Losanges aux points de controle visibles; retourne les zones touchees."""
+        rects = []
+        for world_x, y in self.markers:
+            center_x = world_x - scroll + size // 2
+            if not -MARKER_SIZE <= center_x <= surface.get_width() + MARKER_SIZE:
+                continue
+            center_y = y + size // 2
+            points = [
+                (center_x, center_y - MARKER_SIZE),
+                (center_x + MARKER_SIZE, center_y),
+                (center_x, center_y + MARKER_SIZE),
+                (center_x - MARKER_SIZE, center_y),
+            ]
+            rects.append(pygame.draw.polygon(surface, GREEN, points))
+            pygame.draw.polygon(surface, WHITE, points, 1)
+        return rects
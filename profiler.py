@@ -0,0 +1,166 @@
+"""
+Profilage des images en jeu.
+
+Ce module fournit `FrameProfiler`, active par `python main.py --profile`:
+- chronometres par etape de l'image (entrees, joueur, niveau, collisions,
+  dessin, HUD, envoi a l'ecran),
+- fenetre glissante des temps d'image (p50/p99/max) et images perdues
+  (temps de calcul superieur au budget de `--fps`),
+- nombre d'entites et de particules,
+- panneau a l'ecran (F3) et trace en CSV ou JSON, ecrite au fil des images
+  (la memoire ne grandit pas avec la duree de la session).
+
+Sans `--profile`, aucun profileur n'est cree: le cout se limite a un test
+`is not None` par etape.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+from settings import BLACK, WHITE, YELLOW, WIDTH
+from texts import draw_text
+
+# Etapes mesurees, dans l'ordre de la boucle principale.
+STAGES = ("input", "player", "level", "collision", "draw", "hud", "flip", "overlay")
+# Colonnes de la trace, une ligne par image.
+COLUMNS = ("frame", "time", "interval", "work", "dropped", "steps", "entities", "particles") + STAGES
+# Nombre d'images de la fenetre glissante.
+WINDOW = 600
+# Le panneau n'est recalcule que toutes les OVERLAY_REFRESH images (tri des
+# temps, rendu des textes).
+OVERLAY_REFRESH = 30
+OVERLAY_TEXT_SIZE = 16
+
+
+class FrameProfiler:
+    def __init__(self, fps, window=WINDOW, path=None):
+        """`path`: fichier de trace (.csv, ou .json), ecrit ligne a ligne."""
+        self.budget = 1.0 / fps
+        self.window = deque(maxlen=window)
+        self.stage_window = {stage: deque(maxlen=window) for stage in STAGES}
+        self.frames = 0
+        self.dropped = 0
+        self.show_overlay = True
+        self._trace_file = None
+        self._writer = None
+        self._json = False
+        if path:
+            self._open_trace(path)
+        self._origin = time.perf_counter()
+        self._frame_start = None
+        self._last = None
+        self._stages = dict.fromkeys(STAGES, 0.0)
+        self._lines = []
+        self._panel = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self._interval = now - self._frame_start if self._frame_start is not None else 0.0
+        self._frame_start = now
+        self._last = now
+        for stage in self._stages:
+            self._stages[stage] = 0.0
+
+    def mark(self, stage):
+        """Attribue a `stage` le temps ecoule depuis la marque precedente."""
+        now = time.perf_counter()
+        self._stages[stage] += now - self._last
+        self._last = now
+
+    def end_frame(self, steps=0, entities=0, particles=0):
+        work = self._last - self._frame_start
+        dropped = work > self.budget
+        self.frames += 1
+        self.dropped += dropped
+        self.window.append(work)
+        for stage, seconds in self._stages.items():
+            self.stage_window[stage].append(seconds)
+        if self._trace_file is not None:
+            self._write_row((
+                self.frames, self._frame_start - self._origin, self._interval, work, dropped,
+                steps, entities, particles, *self._stages.values(),
+            ))
+        if self.show_overlay and self.frames % OVERLAY_REFRESH == 1:
+            self._lines = self._overlay_lines(steps, entities, particles)
+
+    def summary(self):
+        """p50/p99/max du temps d'image (ms) et moyenne par etape sur la fenetre."""
+        times = sorted(self.window)
+        if not times:
+            return {}
+
+        def percentile(p):
+            return times[min(len(times) - 1, int(len(times) * p))] * 1000
+
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "budget_ms": self.budget * 1000,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": times[-1] * 1000,
+            "stages_ms": {
+                stage: sum(values) / len(values) * 1000
+                for stage, values in self.stage_window.items()
+            },
+        }
+
+    def _overlay_lines(self, steps, entities, particles):
+        summary = self.summary()
+        lines = [
+            f"image p50 {summary['p50_ms']:.2f} p99 {summary['p99_ms']:.2f} max {summary['max_ms']:.2f} ms",
+            f"perdues {summary['dropped']}/{summary['frames']} (budget {summary['budget_ms']:.1f} ms)",
+            f"entites {entities} particules {particles} pas {steps}",
+        ]
+        lines.extend(f"{stage:<10} {ms:.3f} ms" for stage, ms in summary["stages_ms"].items())
+        return lines
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+
+    def draw(self, surface):
+        """Dessine le panneau (coin haut droit); retourne sa zone ou None."""
+        if not self.show_overlay or not self._lines:
+            return None
+        line_height = OVERLAY_TEXT_SIZE + 2
+        width = 300
+        if self._panel is None:
+            self._panel = pygame.Surface((width, line_height * len(self._lines) + 8))
+            self._panel.set_alpha(170)
+            self._panel.fill(BLACK)
+        left = WIDTH - width - 10
+        rect = surface.blit(self._panel, (left, 10))
+        for i, line in enumerate(self._lines):
+            color = YELLOW if i < 3 else WHITE
+            draw_text(surface, line, (left + 6, 14 + i * line_height), color, OVERLAY_TEXT_SIZE)
+        return rect
+
+    def _open_trace(self, path):
+        self._trace_file = open(path, "w", newline="", encoding="utf-8")
+        self._json = str(path).lower().endswith(".json")
+        if self._json:
+            # Ecrit a la main pour ne pas garder les images en memoire: le
+            # resume n'est connu qu'a la fermeture.
+            self._trace_file.write(f'{{"columns": {json.dumps(COLUMNS)}, "frames": [')
+        else:
+            self._writer = csv.writer(self._trace_file)
+            self._writer.writerow(COLUMNS)
+
+    def _write_row(self, row):
+        if self._json:
+            separator = ",\n" if self.frames > 1 else "\n"
+            self._trace_file.write(separator + json.dumps(row))
+        else:
+            self._writer.writerow(row)
+
+    def close(self):
+        """Termine la trace (resume final pour le JSON) et ferme le fichier."""
+        if self._trace_file is None:
+            return
+        if self._json:
+            self._trace_file.write(f'\n], "summary": {json.dumps(self.summary())}}}\n')
+        self._trace_file.close()
+        self._trace_file = None
@@ -0,0 +1,90 @@
+"""
+Rendu par rectangles sales (dirty rects).
+
+Ce module fournit `DirtyRectRenderer`, un mode de rendu optionnel:
+- seules les zones dessinees a l'image precedente sont effacees (fond restaure),
+- seules les zones modifiees sont envoyees a l'ecran (`display.update(rects)`),
+- les champs du HUD ne sont redessines que si leur valeur change,
+- un ecran fige (menu, fin de partie) n'est pas redessine du tout.
+"""
+import pygame
+
+
+class DirtyRectRenderer:
+    def __init__(self, screen, background):
+        self.screen = screen
+        # Surface plein ecran copiee pour effacer les zones sales.
+        self.background = background
+        self.full_redraw = True
+        # Zones dessinees (effacees a l'image suivante).
+        self._previous = []
+        self._current = []
+        # Zones a envoyer a l'ecran sans les effacer ensuite (HUD).
+        self._updated = []
+        # Champs du HUD: nom -> (valeur, rect).
+        self._fields = {}
+        self._stale_fields = set()
+
+    def invalidate(self):
+        """Force un rendu complet a la prochaine image (changement d'ecran)."""
+        self.full_redraw = True
+
+    def begin_frame(self, field_values=None):
+        """
+        Efface les zones de l'image precedente. `field_values` associe chaque
+        champ du HUD a sa valeur courante: les champs modifies ou recouverts
+        sont effaces ici puis redessines par `field()`.
+        """
+        field_values = field_values or {}
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            self._fields.clear()
+            self._stale_fields = set(field_values)
+            return
+
+        for rect in self._previous:
+            self.screen.blit(self.background, rect, rect)
+
+        self._stale_fields = set()
+        for name, value in field_values.items():
+            previous = self._fields.get(name)
+            if previous is None:
+                self._stale_fields.add(name)
+                continue
+            old_value, old_rect = previous
+            if old_value != value or old_rect.collidelist(self._previous) != -1:
+                self.screen.blit(self.background, old_rect, old_rect)
+                self._updated.append(old_rect)
+                self._stale_fields.add(name)
+
+    def add(self, rects):
+        """Enregistre une ou plusieurs zones dessinees pendant cette image."""
+        if isinstance(rects, pygame.Rect):
+            self._current.append(rects)
+        else:
+            self._current.extend(rects)
+
+    def field(self, name, value, draw):
+        """
+        Dessine un champ du HUD via `draw()` (qui retourne son Rect) s'il a ete
+        efface ou si une zone dessinee pendant cette image le recouvre.
+        """
+        previous = self._fields.get(name)
+        if name not in self._stale_fields:
+            if previous is None or previous[1].collidelist(self._current) == -1:
+                return
+        rect = draw()
+        self._fields[name] = (value, rect)
+        self._updated.append(rect)
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            rects = self._previous + self._current + self._updated
+            if rects:
+                pygame.display.update(rects)
+        self._previous = self._current
+        self._current = []
+        self._updated = []
@@ -0,0 +1,176 @@
+"""
+Enregistrement et relecture deterministes des parties.
+
+Une partie est entierement determinee par le niveau, la graine de la
+simulation et les images ou un saut est demande. Ce module:
+- enregistre ces informations dans un format binaire compact,
+- verifie que le niveau rejoue est identique (hash de la table compilee),
+- rejoue une partie sans affichage a vitesse maximale (`python replay.py f.gdr`)
+  ou a l'ecran (`python main.py --replay f.gdr`).
+"""
+import argparse
+import struct
+import sys
+import time
+
+from level import Level, get_catalog, get_compiled_level
+from simulation import Simulation, STATE_PLAYING, STATE_GAME_OVER, STATE_LEVEL_COMPLETE
+
+MAGIC = b"GDRP"
+# 2: collisions par balayage; les parties de la version 1 ne se rejouent pas
+# a l'identique.
+FORMAT_VERSION = 2
+# magic, version, indice du niveau (-1: infini), graine, hash du niveau,
+# etat final, image finale, nombre de sauts
+HEADER = struct.Struct("<4sHiQ20sBII")
+ENDLESS_LEVEL = -1
+STATE_CODES = {STATE_PLAYING: 0, STATE_GAME_OVER: 1, STATE_LEVEL_COMPLETE: 2}
+STATES = {code: state for state, code in STATE_CODES.items()}
+
+
+def _encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def level_digest(level_index):
+    if level_index == ENDLESS_LEVEL:
+        return bytes(20)
+    return bytes.fromhex(get_compiled_level(level_index).digest)
+
+
+class Replay:
+    def __init__(self, level_index, seed, digest, jump_frames=(), final_state=STATE_PLAYING, final_frame=0):
+        self.level_index = level_index
+        self.seed = seed
+        self.digest = digest
+        self.jump_frames = list(jump_frames)
+        self.final_state = final_state
+        self.final_frame = final_frame
+
+    @classmethod
+    def from_simulation(cls, simulation):
+        level_index = ENDLESS_LEVEL if simulation.endless else simulation.level.level_index
+        return cls(
+            level_index,
+            simulation.seed,
+            level_digest(level_index),
+            simulation.jump_frames,
+            simulation.state,
+            simulation.frame,
+        )
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(
+            MAGIC, FORMAT_VERSION, self.level_index, self.seed, self.digest,
+            STATE_CODES[self.final_state], self.final_frame, len(self.jump_frames),
+        ))
+        # Sauts en ecarts successifs (varint): un octet par saut en pratique.
+        previous = 0
+        for frame in self.jump_frames:
+            _encode_varint(frame - previous, out)
+            previous = frame
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, level_index, seed, digest, state_code, final_frame, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("fichier de replay invalide")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"replay au format {version}, format {FORMAT_VERSION} attendu (physique differente)")
+        jump_frames = []
+        pos = HEADER.size
+        frame = 0
+        for _ in range(count):
+            delta, pos = _decode_varint(data, pos)
+            frame += delta
+            jump_frames.append(frame)
+        return cls(level_index, seed, digest, jump_frames, STATES[state_code], final_frame)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def resolve_level(self):
+        """
+        Indice du niveau a rejouer: celui enregistre s'il a le meme hash, sinon
+        le niveau du catalogue qui correspond (fichiers ajoutes/renommes).
+        """
+        if self.level_index == ENDLESS_LEVEL:
+            return ENDLESS_LEVEL
+        if 0 <= self.level_index < Level.count() and level_digest(self.level_index) == self.digest:
+            return self.level_index
+        for level_index in range(len(get_catalog())):
+            if level_digest(level_index) == self.digest:
+                return level_index
+        raise ValueError("niveau du replay introuvable (contenu modifie ?)")
+
+    def create_simulation(self, effects=True):
+        level_index = self.resolve_level()
+        if level_index == ENDLESS_LEVEL:
+            return Simulation(effects=effects, endless=True, seed=self.seed)
+        return Simulation(level_index, effects=effects, seed=self.seed)
+
+    def inputs(self):
+        """Entree (saut ou non) de chaque image, jusqu'a l'image finale."""
+        jumps = set(self.jump_frames)
+        for frame in range(self.final_frame):
+            yield frame in jumps
+
+    def simulate(self, effects=False):
+        """Rejoue la partie sans affichage et retourne la simulation finale."""
+        simulation = self.create_simulation(effects)
+        simulation.run(self.inputs())
+        return simulation
+
+    def verify(self):
+        simulation = self.simulate()
+        return (simulation.state == self.final_state
+                and simulation.frame == self.final_frame)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejoue des replays sans affichage")
+    parser.add_argument("replays", nargs="+", help="fichiers .gdr")
+    args = parser.parse_args(argv)
+
+    all_ok = True
+    for path in args.replays:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        simulation = replay.simulate()
+        elapsed = time.perf_counter() - start
+        ok = (simulation.state == replay.final_state
+              and simulation.frame == replay.final_frame)
+        all_ok = all_ok and ok
+        fps = simulation.frame / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{path}: {'OK' if ok else 'DIVERGENT'} "
+            f"{simulation.state} image {simulation.frame}/{replay.final_frame} "
+            f"score {simulation.score} ({fps:.0f} images/s)"
+        )
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
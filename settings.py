@@ -7,15 +7,20 @@ Ce module centralise:
 - constantes physiques (gravite, saut, vitesse),
 - definitions des types d'obstacles et de portails.
 """
-import pygame
-
-# Initialisation pygame pour les couleurs
-pygame.init()
+# Aucun sous-systeme pygame n'est initialise ici: importer les reglages (ou
+# la simulation sans affichage) ne demarre ni l'affichage ni l'audio. Le jeu
+# initialise ce dont il a besoin au lancement (voir `main.py`).
 
 # Dimensions
 WIDTH, HEIGHT = 900, 400
 GROUND_Y = 320
 FPS = 60
+# Pas fixe de la physique (images de simulation par seconde), independant de
+# la cadence d'affichage.
+TICK_RATE = 60
+# Temps reel maximal rattrape en une image d'affichage (evite la spirale de
+# rattrapage apres un gel).
+MAX_FRAME_TIME = 0.25
 
 # Couleurs
 BG_COLOR = (30, 30, 40)
@@ -38,6 +43,9 @@ GAME_SPEED = 6
 PLAYER_SIZE = 40
 PLAYER_X = 100
 MAX_JUMPS = 2
+# Un cube touche sur le cote a moins de STEP_UP px sous son dessus est gravi
+# (le joueur s'y pose) au lieu d'etre fatal.
+STEP_UP = 5
 
 # Types d'obstacles
 OBSTACLE_TYPES = {
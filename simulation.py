@@ -0,0 +1,249 @@
+"""
+Simulation du gameplay sans affichage.
+
+Ce module regroupe la logique d'une partie, extraite de la boucle de `main.py`:
+- mise a jour du joueur et du niveau,
+- collisions avec les obstacles et les portails, testees sur tout le
+  deplacement de chaque image (balayage, instant d'impact),
+- transitions de gravite/saut des portails,
+- emission des particules (optionnelle pour les executions sans rendu).
+
+Une `Simulation` avance d'une image a chaque appel a `step(jump)` et ne touche
+jamais a l'ecran: elle peut tourner bien plus vite que `FPS` (bots, validation
+de niveaux, replays).
+
+`snapshot()` capture l'etat complet d'une partie dans des tuples de valeurs
+simples, et `restore()` y revient: points de controle et retour en arriere du
+mode entrainement, branches du solveur et des executions en lot.
+"""
+import random
+from bisect import bisect_left
+
+from settings import *
+from player import Player
+from level import Level
+from utils import sweep_aabb, update_gravity_and_jump
+
+STATE_PLAYING = "PLAYING"
+STATE_GAME_OVER = "GAME_OVER"
+STATE_LEVEL_COMPLETE = "LEVEL_COMPLETE"
+
+
+class Simulation:
+    def __init__(self, level_index=0, effects=True, streaming=False, endless=False, seed=None):
+        self.level_index = level_index
+        # Sans effets, aucune particule n'est creee (execution sans rendu).
+        self.effects = effects
+        self.streaming = streaming
+        # Graine du niveau infini et des particules: une partie est entierement
+        # determinee par (niveau, graine, images ou un saut est demande).
+        self.endless = endless
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        # Profileur optionnel (`profiler.FrameProfiler`), marque chaque etape.
+        self.profiler = None
+        self.player = Player()
+        if endless:
+            self.level = Level.endless(self.seed)
+        else:
+            self.level = Level(level_index, streaming=streaming)
+        self._reset_state()
+
+    def reset(self, seed=None):
+        """
+        Remet la partie a son etat initial. Le joueur et le niveau sont
+        reinitialises sur place, sans recreer d'entites (redemarrages
+        frequents: mode entrainement, executions en lot). `seed` remplace la
+        graine de la partie; en mode infini, elle regenere le niveau.
+        """
+        if seed is not None and seed != self.seed:
+            self.seed = seed
+            if self.endless:
+                self.level.patterns.seed = seed
+        self.player.reset()
+        self.level.reset()
+        self._reset_state()
+
+    def _reset_state(self):
+        self.level.particles.rng.seed(self.seed)
+        self.gravity = BASE_GRAVITY
+        self.jump_power = BASE_JUMP_POWER
+        self.current_gravity_effect = "NORMAL"
+        self.score = 0
+        self.dust_timer = 0
+        self.frame = 0
+        self.state = STATE_PLAYING
+        # Indice global de l'obstacle responsable du game over (statistiques).
+        self.death_obstacle = None
+        # Images (indices de pas) ou un saut a ete demande, pour les replays.
+        self.jump_frames = []
+        self.previous_scroll = self.level.scroll
+        self.previous_y = self.player.y
+
+    def snapshot(self):
+        """
+        Etat complet de la partie: image, score, etat, gravite, saut, effet,
+        poussiere, obstacle fatal, joueur (`Player.snapshot`), niveau
+        (`Level.snapshot`) et generateur des particules (avec effets
+        seulement). Uniquement des tuples, nombres et chaines: copiable,
+        picklable et serialisable en JSON.
+        """
+        return (
+            self.frame,
+            self.score,
+            self.state,
+            self.gravity,
+            self.jump_power,
+            self.current_gravity_effect,
+            self.dust_timer,
+            self.death_obstacle,
+            self.player.snapshot(),
+            self.level.snapshot(),
+            self.level.particles.rng.getstate() if self.effects else None,
+        )
+
+    def restore(self, snapshot):
+        """
+        Revient a l'etat d'un `snapshot()` de la meme partie (meme niveau et
+        meme graine). Les sauts enregistres apres l'image restauree sont
+        oublies: un replay ne garde que la partie effectivement jouee.
+        """
+        (self.frame, self.score, self.state, self.gravity, self.jump_power,
+         self.current_gravity_effect, self.dust_timer, self.death_obstacle,
+         player, level, rng_state) = snapshot
+        self.player.restore(player)
+        self.level.restore(level)
+        if rng_state is not None:
+            version, internal, gauss_next = rng_state
+            # Apres un passage par JSON, l'etat interne est une liste.
+            self.level.particles.rng.setstate((version, tuple(internal), gauss_next))
+        del self.jump_frames[bisect_left(self.jump_frames, self.frame):]
+        self.previous_scroll = self.level.scroll
+        self.previous_y = self.player.y
+
+    @property
+    def running(self):
+        return self.state == STATE_PLAYING
+
+    def step(self, jump=False):
+        """Avance d'une image. `jump` indique si un saut est demande."""
+        if self.state != STATE_PLAYING:
+            return self.state
+
+        player = self.player
+        level = self.level
+        profiler = self.profiler
+
+        self.previous_scroll = level.scroll
+        self.previous_y = player.y
+
+        if jump:
+            self.jump_frames.append(self.frame)
+            player.jump(self.jump_power)
+
+        self.frame += 1
+        self.score += 1
+
+        # Broad-phase: seuls les objets qui chevauchent la colonne balayee par
+        # le joueur pendant l'image sont testes, quelle que soit la longueur
+        # du niveau.
+        left = player.x
+        right = player.x + player.size + GAME_SPEED
+        nearby_obstacles = level.obstacles_in_range(left, right)
+        player.update(self.gravity, nearby_obstacles, level.scroll, GAME_SPEED)
+        if self.effects:
+            self._update_dust(nearby_obstacles, level.scroll)
+        if profiler is not None:
+            profiler.mark("player")
+
+        if level.update(GAME_SPEED):
+            self.state = STATE_LEVEL_COMPLETE
+        if profiler is not None:
+            profiler.mark("level")
+
+        # Deplacement de l'image en coordonnees monde: les collisions sont
+        # testees sur tout le trajet, pas seulement a l'arrivee, et l'obstacle
+        # fatal est le premier touche.
+        size = player.size
+        dx = level.scroll - self.previous_scroll
+        start_x = player.x + self.previous_scroll
+        start_y = self.previous_y
+        dy = player.y - start_y
+        # Zone balayee, en coordonnees ecran apres le defilement.
+        swept_hitbox = player.get_swept_hitbox(start_y, dx).move(-dx, 0)
+        impact = None
+        for index in level.obstacle_collisions(swept_hitbox):
+            hitbox = level.obstacle_hitbox(index)
+            t = sweep_aabb(start_x, start_y, size, size, dx, dy, hitbox)
+            if t is None:
+                continue
+            # Cube touche par le dessus (ou gravi): pas de game over.
+            if level.obstacles[index].kind.solid and start_y + dy * t + size <= hitbox.top + STEP_UP:
+                continue
+            if impact is None or t < impact[0]:
+                impact = (t, index)
+        if impact is not None:
+            self.state = STATE_GAME_OVER
+            self.death_obstacle = level.released_obstacles + impact[1]
+
+        for index in level.portal_collisions(swept_hitbox):
+            if sweep_aabb(start_x, start_y, size, size, dx, dy, level.portal_hitbox(index)) is None:
+                continue
+            portal = level.portals[index]
+            if not portal.activated:
+                self.gravity, self.jump_power, self.current_gravity_effect = update_gravity_and_jump(
+                    portal.gravity_multiplier,
+                    BASE_GRAVITY,
+                    BASE_JUMP_POWER,
+                )
+                portal.apply_effect()
+                if self.effects:
+                    portal_intensity = 1.6 if portal.portal_type == "high" else 1.0
+                    level.create_portal_particles(
+                        portal.x - level.scroll + portal.width // 2,
+                        GROUND_Y - portal.height // 2 - 20,
+                        color=portal.color,
+                        intensity=portal_intensity,
+                    )
+        if profiler is not None:
+            profiler.mark("collision")
+
+        return self.state
+
+    def interpolate(self, alpha):
+        """
+        Defilement et y du joueur interpoles entre les deux dernieres images de
+        simulation (`alpha` dans [0, 1]), pour un rendu fluide a toute cadence.
+        """
+        scroll = self.previous_scroll + (self.level.scroll - self.previous_scroll) * alpha
+        y = self.previous_y + (self.player.y - self.previous_y) * alpha
+        return scroll, y
+
+    def run(self, inputs, max_frames=None):
+        """
+        Joue une sequence d'entrees (une valeur booleenne par image) jusqu'a la
+        fin de la partie, de la sequence ou de `max_frames`.
+        """
+        for jump in inputs:
+            if self.state != STATE_PLAYING:
+                break
+            if max_frames is not None and self.frame >= max_frames:
+                break
+            self.step(jump)
+        return self.state
+
+    def _update_dust(self, obstacles, scroll):
+        player = self.player
+        if player.is_on_ground(obstacles, scroll) and abs(player.velocity_y) < 0.1:
+            self.dust_timer += 1
+            high_gravity = self.current_gravity_effect == "HIGH GRAVITY"
+            dust_interval = 4 if high_gravity else 6
+            if self.dust_timer >= dust_interval:
+                self.level.create_dust_particles(
+                    player.x - 6,
+                    player.y + player.size - 2,
+                    color=DARK_PURPLE if high_gravity else None,
+                    intensity=1.8 if high_gravity else 1.0,
+                )
+                self.dust_timer = 0
+        else:
+            self.dust_timer = 0
@@ -0,0 +1,243 @@
+"""
+Verification de la faisabilite des niveaux.
+
+Ce module cherche, pour chaque niveau, la suite de sauts la plus courte qui
+le termine:
+- recherche en largeur image par image; chaque couche (tous les etats a une
+  image donnee) avance d'un coup avec la physique vectorisee de
+  `population.Population`, identique a celle de `Simulation`,
+- un saut n'est essaye que si un obstacle ou un portail est a portee du plus
+  long vol possible (sinon le joueur retombe avant et rien ne change),
+- deduplication des etats exacts (y, vitesse, sauts restants, gravite): deux
+  etats fusionnes ont le meme avenir, la recherche reste donc complete et le
+  nombre de sauts minimal; les etats au sol se confondent,
+- a etat egal, conservation du chemin avec le moins de sauts; la couche ou
+  le niveau se termine est exploree en entier pour garder la fin la moins
+  couteuse en sauts,
+- la solution est rejouee dans `Simulation` avant d'etre rapportee,
+- plusieurs niveaux verifies en parallele sur un pool de processus.
+
+Usage: `python solver.py [indices...] [--jobs N] [--replay-dir DOSSIER]`.
+Un niveau impossible est signale avec la premiere section bloquante.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from settings import (
+    BASE_GRAVITY, BASE_JUMP_POWER, GAME_SPEED, MAX_JUMPS, OBSTACLE_TYPES, PLAYER_SIZE, PLAYER_X,
+    PORTAL_TYPES,
+)
+from level import Level
+from population import EFFECTS, LEVEL_COMPLETE, Population
+from simulation import Simulation, STATE_LEVEL_COMPLETE
+from utils import update_gravity_and_jump
+
+# Garde-fou: un niveau qui n'est pas termine apres autant d'images est abandonne.
+MAX_FRAMES = 100000
+
+
+def _jump_reach(gravity, jump_power):
+    """
+    Distance (ecran, devant le joueur) au-dela de laquelle un saut decide
+    maintenant ne change plus rien: le plus long vol possible (tous les sauts
+    enchaines au sommet, depuis le plus haut obstacle) se termine avant.
+    """
+    rise = MAX_JUMPS * -jump_power / gravity
+    height = max(kind["height"] for kind in OBSTACLE_TYPES.values())
+    height += MAX_JUMPS * jump_power ** 2 / (2 * gravity)
+    frames = math.ceil(rise + math.sqrt(2 * height / gravity)) + MAX_JUMPS + 1
+    return frames * GAME_SPEED + PLAYER_SIZE
+
+
+# Portee d'un saut pour chaque gravite (`Simulation.current_gravity_effect`).
+JUMP_REACH = {}
+for _portal in PORTAL_TYPES.values():
+    _gravity, _jump_power, _effect = update_gravity_and_jump(
+        _portal["multiplier"], BASE_GRAVITY, BASE_JUMP_POWER,
+    )
+    JUMP_REACH[_effect] = _jump_reach(_gravity, _jump_power)
+
+
+def _reachable(level):
+    # Par gravite (indices de `EFFECTS`): quelque chose est-il a portee de saut?
+    return np.array([
+        bool(level.obstacles_in_range(PLAYER_X, PLAYER_X + JUMP_REACH[effect])
+             or level.portals_in_range(PLAYER_X, PLAYER_X + JUMP_REACH[effect]))
+        for effect in EFFECTS
+    ])
+
+
+def _merge(population, used):
+    """
+    Indices des etats a garder: un par etat exact (y, vitesse, sauts
+    restants, gravite), celui qui a demande le moins de sauts.
+    """
+    alive = np.flatnonzero(population.alive)
+    order = alive[np.argsort(used[alive], kind="stable")]
+    keys = np.column_stack((
+        population.y[order], population.velocity_y[order],
+        population.jumps_remaining[order], population.effect[order],
+    ))
+    _, first = np.unique(keys, axis=0, return_index=True)
+    return np.sort(order[first])
+
+
+def solve(level_index, max_frames=MAX_FRAMES):
+    """
+    Cherche la suite de sauts la plus courte terminant le niveau.
+
+    Retourne un dict: `solvable`, `frame` (image finale), `jumps` (images ou
+    sauter), ou pour un niveau impossible `blocked_frame`, `blocked_x` (x monde)
+    et `blocked_by` (obstacles devant le joueur).
+    """
+    start = time.perf_counter()
+    # La couche courante: un joueur de la population par etat.
+    population = Population(level_index, 1)
+    level = population.level
+    result = {
+        "level": level.level_index,
+        "name": Level.get_name(level_index),
+        "digest": level.compiled.digest,
+        "solvable": False,
+    }
+
+    jumps_used = np.zeros(1, dtype=np.int32)
+    # history[f] = (indice du parent dans la couche f, saut a l'image f),
+    # deux tableaux paralleles aux etats de la couche f + 1.
+    history = []
+    explored = 0
+
+    while population.size and population.frame < max_frames:
+        level.seek(population.scroll)
+        # Une branche sans saut par etat, plus une avec saut s'il reste un
+        # saut et que quelque chose est a portee.
+        count = population.size
+        can_jump = (population.jumps_remaining > 0) & _reachable(level)[population.effect]
+        parents = np.concatenate((np.arange(count), np.flatnonzero(can_jump)))
+        jumps = np.arange(len(parents)) >= count
+        used = jumps_used[parents] + jumps
+        population.select(parents)
+        population.step(jumps)
+        explored += len(parents)
+
+        complete = np.flatnonzero(population.state == LEVEL_COMPLETE)
+        if len(complete):
+            # La couche est terminee: la fin retenue est celle qui demande
+            # le moins de sauts.
+            best = complete[np.argmin(used[complete])]
+            history.append((parents, jumps))
+            path = _path(history, best)
+            result.update(
+                solvable=True,
+                frame=_check(level_index, path),
+                jumps=path,
+                states=explored,
+                seconds=time.perf_counter() - start,
+            )
+            return result
+
+        keep = _merge(population, used)
+        population.select(keep)
+        history.append((parents[keep], jumps[keep]))
+        jumps_used = used[keep]
+
+    # Aucun etat ne survit a l'image `frame`: la section devant le joueur est
+    # infranchissable (ou le niveau est trop long).
+    blocked_frame = population.frame if not population.size else max_frames
+    level.seek((blocked_frame - 1) * GAME_SPEED)
+    ahead = level.obstacles_in_range(PLAYER_X, PLAYER_X + PLAYER_SIZE + 2 * GAME_SPEED)
+    result.update(
+        blocked_frame=blocked_frame,
+        blocked_x=PLAYER_X + blocked_frame * GAME_SPEED,
+        blocked_by=[f"{obstacle.type}@{obstacle.x}" for obstacle in ahead],
+        states=explored,
+        seconds=time.perf_counter() - start,
+    )
+    return result
+
+
+def _path(history, last_index):
+    jumps = []
+    index = last_index
+    for frame in range(len(history) - 1, -1, -1):
+        parents, jumped = history[frame]
+        if jumped[index]:
+            jumps.append(frame)
+        index = parents[index]
+    jumps.reverse()
+    return jumps
+
+
+def _check(level_index, jumps):
+    """Rejoue `jumps` dans `Simulation`; retourne l'image de fin du niveau."""
+    simulation = Simulation(level_index, effects=False, seed=0)
+    jump_frames = set(jumps)
+    while simulation.running:
+        simulation.step(simulation.frame in jump_frames)
+    if simulation.state != STATE_LEVEL_COMPLETE:
+        raise RuntimeError(
+            f"niveau {level_index}: la solution trouvee echoue dans Simulation "
+            f"({simulation.state} a l'image {simulation.frame})"
+        )
+    return simulation.frame
+
+
+def solve_levels(level_indices, jobs=None):
+    """Verifie plusieurs niveaux en parallele (un processus par niveau)."""
+    if jobs == 1 or len(level_indices) <= 1:
+        return [solve(level_index) for level_index in level_indices]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(solve, level_indices))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifie que les niveaux sont faisables")
+    parser.add_argument("levels", nargs="*", type=int, help="indices des niveaux (defaut: tous)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="processus en parallele")
+    parser.add_argument("--replay-dir", help="enregistre la solution de chaque niveau en replay")
+    args = parser.parse_args(argv)
+
+    level_indices = args.levels or list(range(Level.count()))
+    start = time.perf_counter()
+    results = solve_levels(level_indices, args.jobs)
+
+    for result in results:
+        label = f"[{result['level'] + 1}] {result['name']}"
+        if result["solvable"]:
+            print(
+                f"{label}: faisable, {len(result['jumps'])} sauts, image {result['frame']} "
+                f"({result['states']} etats, {result['seconds']:.2f}s)"
+            )
+            print(f"    sauts aux images: {result['jumps']}")
+            if args.replay_dir:
+                _save_replay(result, args.replay_dir)
+        else:
+            blocked_by = ", ".join(result["blocked_by"]) or "?"
+            print(
+                f"{label}: IMPOSSIBLE, bloque a l'image {result['blocked_frame']} "
+                f"(x monde {result['blocked_x']}: {blocked_by})"
+            )
+
+    print(f"{len(results)} niveau(x) en {time.perf_counter() - start:.2f}s")
+    return 0 if all(result["solvable"] for result in results) else 1
+
+
+def _save_replay(result, replay_dir):
+    from replay import Replay
+
+    os.makedirs(replay_dir, exist_ok=True)
+    replay = Replay(
+        result["level"], 0, bytes.fromhex(result["digest"]), result["jumps"],
+        STATE_LEVEL_COMPLETE, result["frame"],
+    )
+    replay.save(os.path.join(replay_dir, f"level_{result['level'] + 1:02d}.gdr"))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
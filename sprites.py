@@ -0,0 +1,147 @@
+"""
+Cache des sprites pre-rendus.
+
+Ce module evite de re-dessiner les memes formes a chaque image:
+- chaque sprite est rendu une seule fois sur une surface puis simplement blitte,
+- les cles sont (type, taille, couleur, palier d'alpha, palier de rotation),
+- les sprites les moins utilises sont evinces (LRU) au-dela de la capacite.
+"""
+import math
+from collections import OrderedDict
+
+import pygame
+from settings import BLACK
+
+ROTATION_STEP = 2
+ALPHA_STEP = 16
+PORTAL_ANIMATION_STEPS = 16
+
+
+class SpriteCache:
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def get(self, key, factory):
+        """Retourne le sprite associe a `key`, cree par `factory()` si absent."""
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = factory()
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.capacity:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
+
+
+SPRITE_CACHE = SpriteCache()
+
+
+def _bucket(value, step):
+    return int(round(value / step)) * step
+
+
+def cube_sprite(size, color, rotation):
+    """Cube du joueur (couleur deja ajustee) tourne par paliers de 2 degres."""
+    angle = _bucket(rotation % 360, ROTATION_STEP) % 360
+    key = ("player", size, color, 0, angle)
+
+    def render():
+        base = SPRITE_CACHE.get(("player", size, color, 0, 0), lambda: _render_cube(size, color))
+        return pygame.transform.rotate(base, angle) if angle else base
+
+    return SPRITE_CACHE.get(key, render)
+
+
+def _render_cube(size, color):
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.rect(surface, BLACK, (0, 0, size, size))
+
+    padding = 4
+    pygame.draw.rect(surface, color, (padding, padding, size - padding*2, size - padding*2))
+
+    inner_padding = size // 3
+    pygame.draw.rect(
+        surface,
+        BLACK,
+        (inner_padding, inner_padding, size - inner_padding*2, size - inner_padding*2),
+    )
+
+    core_padding = int(size / 2.5)
+    pygame.draw.rect(
+        surface,
+        color,
+        (core_padding, core_padding, size - core_padding*2, size - core_padding*2),
+    )
+    return surface
+
+
+def particle_sprite(radius, color, alpha):
+    """Disque semi-transparent de rayon `radius`."""
+    alpha = min(255, _bucket(alpha, ALPHA_STEP))
+    key = ("particle", radius, color, alpha, 0)
+
+    def render():
+        surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (*color, alpha), (radius, radius), radius)
+        return surface
+
+    return SPRITE_CACHE.get(key, render)
+
+
+def obstacle_sprite(obstacle_type, width, height, color):
+    """Obstacle pose au sol; le bas du sprite correspond a la ligne du sol."""
+    key = ("obstacle", (obstacle_type, width, height), color, 0, 0)
+
+    def render():
+        if obstacle_type == "cube":
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+            pygame.draw.rect(surface, color, (0, 0, width, height))
+            pygame.draw.rect(surface, BLACK, (0, 0, width, height), 2)
+        else:
+            # +1: le polygone inclut la ligne du sol et le bord droit.
+            surface = pygame.Surface((width + 1, height + 1), pygame.SRCALPHA)
+            points = [(width//2, 0), (0, height), (width, height)]
+            pygame.draw.polygon(surface, color, points)
+            pygame.draw.polygon(surface, BLACK, points, 2)
+        return surface
+
+    return SPRITE_CACHE.get(key, render)
+
+
+def portal_sprite(width, height, color, animation_offset):
+    """Portail avec son anneau interieur, par paliers d'animation."""
+    # Les 8 points de l'anneau sont symetriques: l'animation boucle tous les
+    # 2*pi/8 radians.
+    period = 2 * math.pi / 8
+    step = int(animation_offset % period / period * PORTAL_ANIMATION_STEPS)
+    key = ("portal", (width, height), color, 0, step)
+
+    def render():
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.ellipse(surface, color, (0, 0, width, height))
+        pygame.draw.ellipse(surface, BLACK, (0, 0, width, height), 2)
+
+        inner_width = width - 10
+        inner_height = height - 10
+        offset = step * period / PORTAL_ANIMATION_STEPS
+        for i in range(8):
+            angle = (2 * math.pi * i / 8) + offset
+            point_x = 5 + inner_width//2 + math.cos(angle) * (inner_width//3)
+            point_y = 5 + inner_height//2 + math.sin(angle) * (inner_height//3)
+            pygame.draw.circle(surface, BLACK, (int(point_x), int(point_y)), 3)
+        return surface
+
+    return SPRITE_CACHE.get(key, render)
@@ -0,0 +1,48 @@
+"""
+Rendu de texte mis en cache.
+
+Ce module centralise:
+- un registre de polices (une seule recherche `SysFont` par nom/taille),
+- un cache LRU des surfaces de texte, indexe par (police, texte, couleur),
+- l'affichage de nombres chiffre par chiffre (score qui change a chaque image).
+"""
+import pygame
+from sprites import SpriteCache
+
+DEFAULT_FONT = "Arial"
+
+_fonts = {}
+TEXT_CACHE = SpriteCache(capacity=256)
+
+
+def get_font(size, name=DEFAULT_FONT):
+    font = _fonts.get((name, size))
+    if font is None:
+        # Le module de polices n'est demarre qu'au premier texte rendu.
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size)
+        _fonts[(name, size)] = font
+    return font
+
+
+def render_text(text, color, size=24, name=DEFAULT_FONT):
+    """Surface du texte, rendue une seule fois par (police, texte, couleur)."""
+    key = ((name, size), text, color)
+    return TEXT_CACHE.get(key, lambda: get_font(size, name).render(text, True, color))
+
+
+def draw_text(surface, text, pos, color, size=24, name=DEFAULT_FONT):
+    text_surface = render_text(text, color, size, name)
+    surface.blit(text_surface, pos)
+    return text_surface.get_rect(topleft=pos)
+
+
+def draw_number(surface, value, pos, color, size=24, name=DEFAULT_FONT):
+    """Dessine un entier a partir des glyphes de chiffres mis en cache."""
+    x, y = pos
+    for digit in str(value):
+        glyph = render_text(digit, color, size, name)
+        surface.blit(glyph, (x, y))
+        x += glyph.get_width()
+    return pygame.Rect(pos[0], y, x - pos[0], get_font(size, name).get_height())
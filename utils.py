@@ -2,23 +2,58 @@
 Fonctions utilitaires du gameplay et du rendu.
 
 Ce module propose:
-- le dessin du sol avec effet de defilement,
+- le fond et le sol pre-rendus, avec un defilement derive du `scroll` du niveau
+  (deterministe, independant de l'horloge),
 - le calcul gravite/saut selon le multiplicateur de portail,
+- le test de collision par balayage (instant d'impact d'une boite en
+  mouvement contre un rectangle fixe),
 - la couleur associee a l'etat de gravite courant.
 """
 import pygame
 from settings import *
 
-def draw_floor(surface):
-    """Dessine le sol avec effet de défilement"""
-    pygame.draw.rect(surface, DARK_GREY, (0, GROUND_Y, WIDTH, HEIGHT - GROUND_Y))
-    pygame.draw.rect(surface, CYAN, (0, GROUND_Y, WIDTH, 4))
-    
-    # Motifs décoratifs
-    for i in range(0, WIDTH, 100):
-        x = (i + pygame.time.get_ticks() // 10) % (WIDTH + 100) - 100
-        pygame.draw.line(surface, (40, 40, 40), 
-                        (x, GROUND_Y + 10), (x + 50, HEIGHT), 3)
+# Periode du motif du sol: la bande pre-rendue se repete tous les FLOOR_TILE px.
+FLOOR_TILE = 100
+
+_background_layer = None
+_floor_strip = None
+
+
+def get_background_layer():
+    """Fond statique plein ecran (rendu une seule fois)."""
+    global _background_layer
+    if _background_layer is None:
+        _background_layer = pygame.Surface((WIDTH, HEIGHT))
+        _background_layer.fill(BG_COLOR)
+    return _background_layer
+
+
+def _get_floor_strip():
+    global _floor_strip
+    if _floor_strip is None:
+        floor_height = HEIGHT - GROUND_Y
+        _floor_strip = pygame.Surface((WIDTH + FLOOR_TILE, floor_height))
+        _floor_strip.fill(DARK_GREY)
+        pygame.draw.rect(_floor_strip, CYAN, (0, 0, WIDTH + FLOOR_TILE, 4))
+
+        # Motifs décoratifs (un par tuile, y compris celui qui entre par la gauche)
+        for x in range(-FLOOR_TILE, WIDTH + FLOOR_TILE, FLOOR_TILE):
+            pygame.draw.line(_floor_strip, (40, 40, 40),
+                             (x, 10), (x + 50, floor_height), 3)
+    return _floor_strip
+
+
+def draw_floor(surface, scroll=0):
+    """Dessine le sol décalé selon le défilement et retourne sa zone"""
+    surface.blit(_get_floor_strip(), (-(int(scroll) % FLOOR_TILE), GROUND_Y))
+    return pygame.Rect(0, GROUND_Y, WIDTH, HEIGHT - GROUND_Y)
+
+
+def draw_background(surface, scroll=0):
+    """Dessine le fond et le sol (deux blits de couches pré-rendues)"""
+    surface.blit(get_background_layer(), (0, 0), (0, 0, WIDTH, GROUND_Y))
+    return draw_floor(surface, scroll)
+
 
 def update_gravity_and_jump(gravity_multiplier, base_gravity, base_jump_power):
     """Calcule la nouvelle gravité et force de saut"""
@@ -36,6 +71,44 @@ def update_gravity_and_jump(gravity_multiplier, base_gravity, base_jump_power):
     
     return gravity, jump_power, effect
 
+def sweep_aabb(left, top, width, height, dx, dy, rect):
+    """
+    Instant d'impact, dans [0, 1[, de la boite (left, top, width, height)
+    deplacee de (dx, dy) pendant le pas contre le rectangle fixe `rect`; None
+    si elle ne le touche pas. Une boite qui chevauche deja `rect` le touche a
+    0. Des bords qui se touchent sans se chevaucher ne comptent pas, comme
+    pour `pygame.Rect.colliderect`.
+    """
+    # Methode des intervalles: sur chaque axe, instants d'entree et de sortie
+    # du chevauchement; le contact existe si les intervalles se recoupent.
+    if dx == 0:
+        if left >= rect.right or left + width <= rect.left:
+            return None
+        t_entry, t_exit = 0.0, 1.0
+    else:
+        t0 = (rect.left - left - width) / dx
+        t1 = (rect.right - left) / dx
+        if t0 > t1:
+            t0, t1 = t1, t0
+        t_entry = max(t0, 0.0)
+        t_exit = min(t1, 1.0)
+    if dy == 0:
+        if top >= rect.bottom or top + height <= rect.top:
+            return None
+    else:
+        t0 = (rect.top - top - height) / dy
+        t1 = (rect.bottom - top) / dy
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_entry:
+            t_entry = t0
+        if t1 < t_exit:
+            t_exit = t1
+    if t_entry >= t_exit:
+        return None
+    return t_entry
+
+
 def get_gravity_color(effect):
     """Retourne la couleur associée à l'effet de gravité"""
     if effect == "LOW GRAVITY":